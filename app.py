@@ -1,245 +1,296 @@
 import streamlit as st
 import json
-import random
+import os
 import time
-from database import init_db, save_session, get_leaderboard, get_all_sessions
+import metrics
+from database import (HISTORY_PAGE_SIZE, init_db, save_session, get_leaderboard, get_sessions_page, count_sessions,
+                      get_player_trend, get_category_accuracy, get_head_to_head)
+from quiz_bank import ALL, DIFFICULTIES, get_bank
+from selection import select_questions
+from telemetry import record_results
+from game import TIE, GameSession
 
 st.set_page_config(page_title="Quiz Islamique - Nafi vs Moya", page_icon="📚", layout="wide")
 
+rerun_started = time.perf_counter()
+previous_profiler = st.session_state.pop('active_profiler', None)
+if previous_profiler is not None:
+    previous_profiler.disable()
+if st.session_state.get('profile_reruns'):
+    st.session_state.active_profiler = metrics.start_profile()
+
 init_db()
 
-def load_quizzes():
-    with open('quizzes.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['quizzes']
+BADGES = {"Nafi": "🔵", "Moya": "🔴"}
+TIMER_TICK_SECONDS = 1
+OPERATOR_TOKEN = os.getenv('OPERATOR_TOKEN')
+PAGES = ["🎮 Quiz", "🏆 Classement", "📊 Historique", "⚙️ Paramètres"]
+PERFORMANCE_PAGE = "⏱️ Performance"
+
+if metrics.METRICS_PORT:
+    try:
+        metrics.serve_metrics(metrics.METRICS_PORT)
+    except OSError as e:
+        print(f"Warning: metrics endpoint unavailable: {e}")
 
-def filter_quizzes(all_quizzes, category, difficulty):
-    filtered = all_quizzes
-    if category != "Toutes":
-        filtered = [q for q in filtered if q.get('category') == category]
-    if difficulty != "Toutes":
-        filtered = [q for q in filtered if q.get('difficulty') == difficulty]
-    return filtered
+def badge(player):
+    return BADGES.get(player, "👤")
 
 def initialize_session():
-    if 'all_quizzes' not in st.session_state:
-        st.session_state.all_quizzes = load_quizzes()
-    
-    if 'quizzes' not in st.session_state:
-        st.session_state.quizzes = st.session_state.all_quizzes.copy()
-        random.shuffle(st.session_state.quizzes)
-    
-    if 'current_question' not in st.session_state:
-        st.session_state.current_question = 0
-    
-    if 'nafi_score' not in st.session_state:
-        st.session_state.nafi_score = 0
-    
-    if 'moya_score' not in st.session_state:
-        st.session_state.moya_score = 0
-    
-    if 'answered' not in st.session_state:
-        st.session_state.answered = False
-    
-    if 'last_answer' not in st.session_state:
-        st.session_state.last_answer = None
-    
-    if 'last_player' not in st.session_state:
-        st.session_state.last_player = None
-    
-    if 'selected_category' not in st.session_state:
-        st.session_state.selected_category = "Toutes"
-    
-    if 'selected_difficulty' not in st.session_state:
-        st.session_state.selected_difficulty = "Toutes"
-    
-    if 'timer_enabled' not in st.session_state:
-        st.session_state.timer_enabled = False
-    
-    if 'timer_duration' not in st.session_state:
-        st.session_state.timer_duration = 30
-    
-    if 'question_start_time' not in st.session_state:
-        st.session_state.question_start_time = None
-    
-    if 'nafi_choice' not in st.session_state:
-        st.session_state.nafi_choice = None
-    
-    if 'moya_choice' not in st.session_state:
-        st.session_state.moya_choice = None
+    if 'quiz' not in st.session_state:
+        st.session_state.game_bank = bank
+        st.session_state.quiz = GameSession(select_questions(bank), bank.digest)
+
+def restart_quiz(question_ids):
+    """Start a new game on the latest bank; a game in progress keeps the bank it was drawn from."""
+    global game_bank
+    game_bank = st.session_state.game_bank = bank
+    quiz.restart(question_ids, bank.digest)
 
 def validate_answers():
-    current_quiz = st.session_state.quizzes[st.session_state.current_question]
-    correct_answer = current_quiz['answer']
-    
-    st.session_state.answered = True
-    
-    if st.session_state.nafi_choice == correct_answer:
-        st.session_state.nafi_score += 1
-    
-    if st.session_state.moya_choice == correct_answer:
-        st.session_state.moya_score += 1
+    record_results(quiz.validate(game_bank.get(quiz.current_id)['answer']), game_bank)
 
-def next_question():
-    st.session_state.current_question += 1
-    st.session_state.answered = False
-    st.session_state.nafi_choice = None
-    st.session_state.moya_choice = None
-    st.session_state.question_start_time = time.time() if st.session_state.timer_enabled else None
+@st.fragment(run_every=TIMER_TICK_SECONDS)
+def countdown():
+    quiz = st.session_state.quiz
+    if quiz.answered or quiz.finished:
+        return
+    remaining = quiz.remaining(time.time())
+    if remaining is None:
+        return
+    if remaining > 0:
+        st.info(f"⏱️ Temps restant : {int(remaining + 0.999)} secondes")
+    else:
+        st.error("⏰ Temps écoulé !")
+        validate_answers()
+        st.rerun(scope="app")
+
+def save_finished_quiz():
+    if not quiz.saved and len(quiz) > 0:
+        save_session(quiz.scores, len(quiz), answers=quiz.category_answers(game_bank))
+        quiz.saved = True
 
 def reset_quiz(save_current=False):
-    if save_current and len(st.session_state.quizzes) > 0:
-        save_session(
-            st.session_state.nafi_score,
-            st.session_state.moya_score,
-            len(st.session_state.quizzes)
-        )
+    if save_current:
+        save_finished_quiz()
     
-    st.session_state.current_question = 0
-    st.session_state.nafi_score = 0
-    st.session_state.moya_score = 0
-    st.session_state.answered = False
-    st.session_state.nafi_choice = None
-    st.session_state.moya_choice = None
-    st.session_state.question_start_time = None
-    filtered = filter_quizzes(st.session_state.all_quizzes, st.session_state.selected_category, st.session_state.selected_difficulty)
-    st.session_state.quizzes = filtered.copy() if filtered else st.session_state.all_quizzes.copy()
-    random.shuffle(st.session_state.quizzes)
+    filtered = select_questions(bank, quiz.category, quiz.difficulty)
+    restart_quiz(filtered if filtered else select_questions(bank))
 
+bank = get_bank()
 initialize_session()
+quiz = st.session_state.quiz
+game_bank = st.session_state.game_bank
 
 with st.sidebar:
     st.title("📚 Navigation")
-    page = st.radio("Menu", ["🎮 Quiz", "🏆 Classement", "📊 Historique", "⚙️ Paramètres"])
+    is_operator = bool(OPERATOR_TOKEN) and st.query_params.get('operator') == OPERATOR_TOKEN
+    page = st.radio("Menu", PAGES + [PERFORMANCE_PAGE] if is_operator else PAGES)
     
     if page == "🎮 Quiz":
         st.divider()
         st.subheader("Filtres")
         
-        categories = ["Toutes"] + sorted(list(set([q.get('category', 'Toutes') for q in st.session_state.all_quizzes])))
-        difficulties = ["Toutes", "Facile", "Moyen", "Difficile"]
+        categories = [ALL] + game_bank.categories
+        difficulties = [ALL] + DIFFICULTIES
         
-        category = st.selectbox("Catégorie", categories, index=categories.index(st.session_state.selected_category))
-        difficulty = st.selectbox("Difficulté", difficulties, index=difficulties.index(st.session_state.selected_difficulty))
+        category = st.selectbox("Catégorie", categories, index=categories.index(quiz.category))
+        difficulty = st.selectbox("Difficulté", difficulties, index=difficulties.index(quiz.difficulty))
         
-        if category != st.session_state.selected_category or difficulty != st.session_state.selected_difficulty:
-            st.session_state.selected_category = category
-            st.session_state.selected_difficulty = difficulty
-            filtered = filter_quizzes(st.session_state.all_quizzes, category, difficulty)
+        if category != quiz.category or difficulty != quiz.difficulty:
+            quiz.category = category
+            quiz.difficulty = difficulty
+            filtered = select_questions(bank, category, difficulty)
             if filtered and len(filtered) > 0:
-                st.session_state.quizzes = filtered.copy()
-                random.shuffle(st.session_state.quizzes)
-                st.session_state.current_question = 0
-                st.session_state.nafi_score = 0
-                st.session_state.moya_score = 0
-                st.session_state.answered = False
-                st.session_state.nafi_choice = None
-                st.session_state.moya_choice = None
-                st.session_state.question_start_time = None
-                st.session_state.quiz_saved = False
+                restart_quiz(filtered)
                 st.rerun()
             else:
                 st.warning("Aucun quiz ne correspond à ces critères. Veuillez modifier vos filtres.")
         
         st.divider()
         st.subheader("Chronomètre")
-        timer_enabled = st.checkbox("Activer le chronomètre", value=st.session_state.timer_enabled)
-        if timer_enabled != st.session_state.timer_enabled:
-            st.session_state.timer_enabled = timer_enabled
+        timer_enabled = st.checkbox("Activer le chronomètre", value=quiz.timer_enabled)
+        if timer_enabled != quiz.timer_enabled:
+            quiz.timer_enabled = timer_enabled
         
         if timer_enabled:
-            timer_duration = st.slider("Durée (secondes)", 10, 120, st.session_state.timer_duration, 5)
-            if timer_duration != st.session_state.timer_duration:
-                st.session_state.timer_duration = timer_duration
+            timer_duration = st.slider("Durée (secondes)", 10, 120, quiz.timer_duration, 5)
+            if timer_duration != quiz.timer_duration:
+                quiz.timer_duration = timer_duration
 
 if page == "🏆 Classement":
     st.title("🏆 Classement")
     
-    leaderboard = get_leaderboard()
+    leaderboard = get_leaderboard(quiz.players)
     
     if leaderboard:
-        col1, col2 = st.columns(2)
+        for col, stats in zip(st.columns(len(leaderboard)), leaderboard):
+            with col:
+                st.subheader(f"{badge(stats.player_name)} {stats.player_name}")
+                st.metric("Parties jouées", stats.total_games)
+                st.metric("Victoires", stats.total_wins)
+                st.metric("Score total", stats.total_score)
+                st.metric("Moyenne", f"{stats.average_score:.2f}")
+                if stats.total_games > 0:
+                    st.metric("Taux de victoire", f"{stats.win_rate * 100:.1f}%")
+                for category in get_category_accuracy(stats.player_name):
+                    st.progress(category.accuracy, text=f"{category.category} : {category.accuracy * 100:.0f}% "
+                                                        f"({category.correct}/{category.questions})")
         
-        for stats in leaderboard:
-            if stats.player_name == "Nafi":
-                with col1:
-                    st.subheader("🔵 Nafi")
-                    st.metric("Parties jouées", stats.total_games)
-                    st.metric("Victoires", stats.total_wins)
-                    st.metric("Score total", stats.total_score)
-                    st.metric("Moyenne", f"{stats.average_score:.2f}")
-                    if stats.total_games > 0:
-                        win_rate = (stats.total_wins / stats.total_games) * 100
-                        st.metric("Taux de victoire", f"{win_rate:.1f}%")
-            
-            elif stats.player_name == "Moya":
-                with col2:
-                    st.subheader("🔴 Moya")
-                    st.metric("Parties jouées", stats.total_games)
-                    st.metric("Victoires", stats.total_wins)
-                    st.metric("Score total", stats.total_score)
-                    st.metric("Moyenne", f"{stats.average_score:.2f}")
-                    if stats.total_games > 0:
-                        win_rate = (stats.total_wins / stats.total_games) * 100
-                        st.metric("Taux de victoire", f"{win_rate:.1f}%")
+        if len(quiz.players) == 2:
+            duel = get_head_to_head(*quiz.players)
+            if duel.games:
+                st.divider()
+                st.subheader("⚔️ Face à face")
+                opponent = quiz.players[1]
+                col1, col2, col3 = st.columns(3)
+                col1.metric(f"Victoires {duel.player}", duel.wins)
+                col2.metric("Égalités", duel.ties)
+                col3.metric(f"Victoires {opponent}", duel.opponent_wins)
+        
+        trends = {stats.player_name: get_player_trend(stats.player_name) for stats in leaderboard}
+        if any(len(trend) > 1 for trend in trends.values()):
+            st.divider()
+            st.subheader("📈 Taux de victoire par jour")
+            st.line_chart({
+                player: {day.day.isoformat(): day.win_rate * 100 for day in trend} for player, trend in trends.items()
+            })
+        
+        ranking = get_leaderboard()
+        if len(ranking) > len(leaderboard):
+            st.divider()
+            st.subheader("Tous les joueurs")
+            st.dataframe([
+                {"Joueur": stats.player_name, "Parties": stats.total_games, "Victoires": stats.total_wins,
+                 "Score total": stats.total_score, "Moyenne": round(stats.average_score, 2),
+                 "Taux de victoire": f"{stats.win_rate * 100:.1f}%"}
+                for stats in ranking
+            ], use_container_width=True, hide_index=True)
     else:
         st.info("Aucune partie jouée pour le moment. Commencez un quiz !")
 
 elif page == "📊 Historique":
     st.title("📊 Historique des parties")
     
-    sessions = get_all_sessions()
+    if 'history_cursors' not in st.session_state:
+        st.session_state.history_cursors = [None]
+    
+    total_sessions = count_sessions()
+    sessions = get_sessions_page(st.session_state.history_cursors[-1], HISTORY_PAGE_SIZE + 1)
+    has_more = len(sessions) > HISTORY_PAGE_SIZE
+    sessions = sessions[:HISTORY_PAGE_SIZE]
     
     if sessions:
+        page_number = len(st.session_state.history_cursors)
+        st.caption(f"{total_sessions} parties au total — page {page_number}")
+        
         for session in sessions:
             with st.expander(f"{session.session_date.strftime('%d/%m/%Y %H:%M')} - {session.winner} gagne"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("🔵 Nafi", session.nafi_score)
-                with col2:
-                    st.metric("Total questions", session.total_questions)
-                with col3:
-                    st.metric("🔴 Moya", session.moya_score)
+                cols = st.columns(len(session.scores) + 1)
+                cols[0].metric("Total questions", session.total_questions)
+                for col, (player, score) in zip(cols[1:], session.scores.items()):
+                    col.metric(f"{badge(player)} {player}", score)
+        
+        col_prev, col_next = st.columns(2)
+        with col_prev:
+            if page_number > 1 and st.button("⬅️ Plus récentes", use_container_width=True):
+                st.session_state.history_cursors.pop()
+                st.rerun()
+        with col_next:
+            if has_more and st.button("Plus anciennes ➡️", use_container_width=True):
+                last = sessions[-1]
+                st.session_state.history_cursors.append((last.session_date, last.id))
+                st.rerun()
+    elif len(st.session_state.history_cursors) > 1:
+        st.session_state.history_cursors = [None]
+        st.rerun()
     else:
         st.info("Aucune partie jouée pour le moment. Commencez un quiz !")
 
 elif page == "⚙️ Paramètres":
     st.title("⚙️ Paramètres")
     
+    st.subheader("🔎 Rechercher une question")
+    query = st.text_input("Mots de la question ou des options", placeholder="ex. sourate monotheisme")
+    if query.strip():
+        from search import SEARCH_LIMIT, search_questions
+        
+        matches = search_questions(query, bank, limit=SEARCH_LIMIT + 1)
+        if matches:
+            more = "+" if len(matches) > SEARCH_LIMIT else ""
+            st.caption(f"{min(len(matches), SEARCH_LIMIT)}{more} résultats")
+            st.dataframe([
+                {"N°": bank.stable_id(question_id), "Question": question['question'], "Réponse": question['answer'],
+                 "Catégorie": question.get('category'), "Difficulté": question.get('difficulty')}
+                for question_id, question in ((i, bank.get(i)) for i in matches[:SEARCH_LIMIT])
+            ], use_container_width=True, hide_index=True)
+        else:
+            st.info("Aucune question ne correspond à cette recherche.")
+    
+    threshold = st.slider("Seuil de similarité des quasi-doublons", 0.5, 1.0, 0.8, 0.05)
+    if st.button("Détecter les quasi-doublons"):
+        from search import bank_near_duplicates
+        
+        pairs = bank_near_duplicates(bank, threshold)
+        if pairs:
+            st.warning(f"⚠️ {len(pairs)} paires de questions quasi identiques.")
+            st.dataframe([
+                {"Similarité": f"{similarity:.0%}", "N°": bank.stable_id(i), "Question": bank.get(i)['question'],
+                 "N° doublon": bank.stable_id(j), "Doublon": bank.get(j)['question']}
+                for i, j, similarity in sorted(pairs, key=lambda pair: -pair[2])
+            ], use_container_width=True, hide_index=True)
+        else:
+            st.success("Aucun quasi-doublon détecté.")
+    
+    st.divider()
     st.subheader("📤 Importer des questions personnalisées")
     st.info("Téléchargez un fichier JSON avec vos propres questions de quiz.")
+    st.caption(f"Banque actuelle : {len(bank)} questions (version {bank.version})")
     
     uploaded_file = st.file_uploader("Choisir un fichier JSON", type=['json'])
+    mode = st.radio("Mode d'import", ["Remplacer la banque", "Fusionner avec la banque"], horizontal=True,
+                    help="Dans les deux cas, les questions déjà connues gardent leur numéro et leurs statistiques.")
+    keep_existing = mode == "Fusionner avec la banque"
     
     if uploaded_file is not None:
+        from quiz_import import format_merge, import_quizzes
+        
         try:
-            custom_quizzes = json.load(uploaded_file)
+            upload_key = (uploaded_file.file_id, keep_existing, bank.digest)
+            if st.session_state.get('upload_report_id') != upload_key:
+                uploaded_file.seek(0)
+                st.session_state.upload_report = import_quizzes(uploaded_file, dry_run=True, keep_existing=keep_existing)
+                st.session_state.upload_report_id = upload_key
+            report = st.session_state.upload_report
             
-            if 'quizzes' in custom_quizzes and isinstance(custom_quizzes['quizzes'], list):
-                if len(custom_quizzes['quizzes']) == 0:
-                    st.error("Le fichier JSON doit contenir au moins une question.")
-                else:
-                    st.success(f"✅ {len(custom_quizzes['quizzes'])} questions chargées avec succès !")
-                    
-                    if st.button("Utiliser ces questions"):
-                        with open('quizzes.json', 'w', encoding='utf-8') as f:
-                            json.dump(custom_quizzes, f, ensure_ascii=False, indent=2)
-                        
-                        st.session_state.all_quizzes = custom_quizzes['quizzes']
-                        st.session_state.quizzes = st.session_state.all_quizzes.copy()
-                        random.shuffle(st.session_state.quizzes)
-                        st.session_state.current_question = 0
-                        st.session_state.nafi_score = 0
-                        st.session_state.moya_score = 0
-                        st.session_state.answered = False
-                        st.session_state.nafi_choice = None
-                        st.session_state.moya_choice = None
-                        st.session_state.quiz_saved = False
-                        
-                        st.success("Questions importées et quiz réinitialisé !")
-                        st.rerun()
+            if report.rejected or report.duplicates:
+                st.warning(f"⚠️ {report.rejected} questions rejetées et {report.duplicates} doublons ignorés sur {report.rows}.")
+                st.dataframe([{"Question n°": row, "Erreur": message} for row, message in report.errors],
+                             use_container_width=True, hide_index=True)
+            
+            if report.accepted == 0:
+                st.error("Le fichier JSON doit contenir au moins une question valide.")
             else:
-                st.error("Le fichier JSON doit contenir une clé 'quizzes' avec une liste de questions.")
+                st.success(f"✅ {report.accepted} questions valides chargées avec succès !")
+                st.caption(f"Après import : {format_merge(report.merge)}")
+                labels = {'added': "Ajoutée", 'removed': "Retirée", 'changed': "Modifiée"}
+                changes = [{"Changement": labels[kind], "N°": stable_id, "Question": question}
+                           for kind, examples in report.merge.examples.items() for stable_id, question in examples]
+                if changes:
+                    with st.expander("Aperçu des changements"):
+                        st.dataframe(changes, use_container_width=True, hide_index=True)
+                
+                if st.button("Utiliser ces questions"):
+                    uploaded_file.seek(0)
+                    report = import_quizzes(uploaded_file, keep_existing=keep_existing)
+                    
+                    bank = get_bank()
+                    restart_quiz(select_questions(bank))
+                    quiz.category = ALL
+                    quiz.difficulty = ALL
+                    
+                    st.success(f"Questions importées (version {report.version}) et quiz réinitialisé !")
+                    st.rerun()
         except json.JSONDecodeError:
             st.error("Erreur : Le fichier n'est pas un JSON valide.")
         except Exception as e:
@@ -261,167 +312,153 @@ elif page == "⚙️ Paramètres":
 }
     ''', language='json')
 
+elif page == PERFORMANCE_PAGE:
+    st.title("⏱️ Performance")
+    
+    spans = metrics.registry.snapshot()
+    if spans:
+        st.dataframe([
+            {"Opération": stats.name, "Appels": stats.count, "p50 (ms)": round(stats.p50 * 1000, 2),
+             "p90 (ms)": round(stats.p90 * 1000, 2), "p99 (ms)": round(stats.p99 * 1000, 2),
+             "Max (ms)": round(stats.max * 1000, 2), "Total (s)": round(stats.total, 3)}
+            for stats in spans
+        ], use_container_width=True, hide_index=True)
+        st.caption(f"Percentiles sur les {metrics.WINDOW} derniers appels de chaque opération, "
+                   "tous utilisateurs confondus depuis le démarrage du serveur.")
+    else:
+        st.info("Aucune mesure pour le moment.")
+    
+    gauges = metrics.registry.gauges()
+    if gauges:
+        st.dataframe([{"Jauge": name, "Valeur": value} for name, value in sorted(gauges.items())],
+                     use_container_width=True, hide_index=True)
+    
+    st.divider()
+    st.subheader("🔬 Profilage")
+    st.checkbox("Profiler chaque rechargement (cProfile)", value=st.session_state.get('profile_reruns', False),
+                key='profile_toggle', on_change=lambda: st.session_state.update(profile_reruns=st.session_state.profile_toggle))
+    if st.session_state.get('last_profile'):
+        st.caption("Dernier rechargement profilé, trié par temps cumulé :")
+        st.code(st.session_state.last_profile, language=None)
+    
+    st.divider()
+    st.subheader("📤 Export Prometheus")
+    col_download, col_write, col_reset = st.columns(3)
+    col_download.download_button("Télécharger", metrics.registry.prometheus(), file_name="metrics.prom",
+                                 mime="text/plain", use_container_width=True)
+    if col_write.button(f"Écrire {metrics.METRICS_FILE}", use_container_width=True):
+        st.success(f"Mesures écrites dans {metrics.write_prometheus()}")
+    if col_reset.button("Réinitialiser les mesures", use_container_width=True):
+        metrics.registry.reset()
+        st.rerun()
+    if metrics.METRICS_PORT:
+        st.caption(f"Point d'accès : http://127.0.0.1:{metrics.METRICS_PORT}/metrics")
+
 elif page == "🎮 Quiz":
     st.title("📚 Quiz Islamique")
-    st.subheader("Nafi vs Moya")
+    st.subheader(" vs ".join(quiz.players))
 
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col1:
-        st.metric("🔵 Nafi", st.session_state.nafi_score)
-    with col2:
-        st.metric("📊 Question", f"{st.session_state.current_question + 1}/{len(st.session_state.quizzes)}")
-    with col3:
-        st.metric("🔴 Moya", st.session_state.moya_score)
+    first, *others = quiz.players
+    score_cols = st.columns(len(quiz.players) + 1)
+    score_cols[0].metric(f"{badge(first)} {first}", quiz.scores[first])
+    score_cols[1].metric("📊 Question", f"{quiz.current_question + 1}/{len(quiz)}")
+    for col, player in zip(score_cols[2:], others):
+        col.metric(f"{badge(player)} {player}", quiz.scores[player])
 
     st.divider()
 
-    if st.session_state.current_question < len(st.session_state.quizzes):
-        current_quiz = st.session_state.quizzes[st.session_state.current_question]
+    if not quiz.finished:
+        current_quiz = game_bank.get(quiz.current_id)
+        now = time.time()
+        quiz.show_question(now)
         
-        if st.session_state.timer_enabled and not st.session_state.answered:
-            if st.session_state.question_start_time is None:
-                st.session_state.question_start_time = time.time()
-            
-            elapsed = time.time() - st.session_state.question_start_time
-            remaining = max(0, st.session_state.timer_duration - elapsed)
-            
-            timer_placeholder = st.empty()
-            if remaining > 0:
-                timer_placeholder.info(f"⏱️ Temps restant : {int(remaining)} secondes")
-            else:
-                timer_placeholder.error("⏰ Temps écoulé !")
-                if not st.session_state.answered:
-                    validate_answers()
-                    st.rerun()
+        if quiz.timer_enabled and not quiz.answered:
+            countdown()
         
         st.markdown(f"### {current_quiz['question']}")
         st.write("")
         
-        if not st.session_state.answered:
-            col_nafi, col_center, col_moya = st.columns([2, 0.5, 2])
-            
-            with col_nafi:
-                st.markdown("#### 🔵 Réponse de Nafi")
-                for idx, option in enumerate(current_quiz['options']):
-                    button_type = "primary" if st.session_state.nafi_choice == option else "secondary"
-                    if st.button(f"{chr(65+idx)}. {option}", key=f"nafi_{idx}", 
-                               use_container_width=True, type=button_type):
-                        st.session_state.nafi_choice = option
-                        st.rerun()
-            
-            with col_moya:
-                st.markdown("#### 🔴 Réponse de Moya")
-                for idx, option in enumerate(current_quiz['options']):
-                    button_type = "primary" if st.session_state.moya_choice == option else "secondary"
-                    if st.button(f"{chr(65+idx)}. {option}", key=f"moya_{idx}", 
-                               use_container_width=True, type=button_type):
-                        st.session_state.moya_choice = option
-                        st.rerun()
+        col_nafi, col_center, col_moya = st.columns([2, 0.5, 2])
+        player_cols = dict(zip(quiz.players, (col_nafi, col_moya)))
+        
+        if not quiz.answered:
+            for player, col in player_cols.items():
+                with col:
+                    st.markdown(f"#### {badge(player)} Réponse de {player}")
+                    for idx, option in enumerate(current_quiz['options']):
+                        button_type = "primary" if quiz.choices[player] == option else "secondary"
+                        if st.button(f"{chr(65+idx)}. {option}", key=f"{player.lower()}_{idx}", 
+                                   use_container_width=True, type=button_type):
+                            if not quiz.choose(player, option, time.time()):
+                                validate_answers()
+                            st.rerun()
             
             st.write("")
             
-            both_answered = st.session_state.nafi_choice is not None and st.session_state.moya_choice is not None
-            if both_answered:
+            missing = quiz.waiting_for
+            if not missing:
                 if st.button("✅ Valider les réponses", use_container_width=True, type="primary"):
                     validate_answers()
                     st.rerun()
             else:
-                missing = []
-                if st.session_state.nafi_choice is None:
-                    missing.append("Nafi")
-                if st.session_state.moya_choice is None:
-                    missing.append("Moya")
                 st.info(f"⏳ En attente de la réponse de : {', '.join(missing)}")
         else:
-            col_nafi, col_center, col_moya = st.columns([2, 0.5, 2])
-            
-            with col_nafi:
-                st.markdown("#### 🔵 Réponse de Nafi")
-                for idx, option in enumerate(current_quiz['options']):
-                    if option == current_quiz['answer'] and option == st.session_state.nafi_choice:
-                        st.success(f"✅ {chr(65+idx)}. {option}")
-                    elif option == st.session_state.nafi_choice:
-                        st.error(f"❌ {chr(65+idx)}. {option}")
-                    elif option == current_quiz['answer']:
-                        st.info(f"✓ {chr(65+idx)}. {option}")
-                    else:
-                        st.markdown(f"{chr(65+idx)}. {option}")
-            
-            with col_moya:
-                st.markdown("#### 🔴 Réponse de Moya")
-                for idx, option in enumerate(current_quiz['options']):
-                    if option == current_quiz['answer'] and option == st.session_state.moya_choice:
-                        st.success(f"✅ {chr(65+idx)}. {option}")
-                    elif option == st.session_state.moya_choice:
-                        st.error(f"❌ {chr(65+idx)}. {option}")
-                    elif option == current_quiz['answer']:
-                        st.info(f"✓ {chr(65+idx)}. {option}")
-                    else:
-                        st.markdown(f"{chr(65+idx)}. {option}")
+            for player, col in player_cols.items():
+                with col:
+                    st.markdown(f"#### {badge(player)} Réponse de {player}")
+                    for idx, option in enumerate(current_quiz['options']):
+                        if option == current_quiz['answer'] and option == quiz.choices[player]:
+                            st.success(f"✅ {chr(65+idx)}. {option}")
+                        elif option == quiz.choices[player]:
+                            st.error(f"❌ {chr(65+idx)}. {option}")
+                        elif option == current_quiz['answer']:
+                            st.info(f"✓ {chr(65+idx)}. {option}")
+                        else:
+                            st.markdown(f"{chr(65+idx)}. {option}")
             
             st.write("")
             
-            results_col1, results_col2 = st.columns(2)
-            with results_col1:
-                if st.session_state.nafi_choice == current_quiz['answer']:
-                    st.success("🎉 Nafi a trouvé la bonne réponse ! +1 point")
-                else:
-                    st.error("❌ Nafi s'est trompé")
-            
-            with results_col2:
-                if st.session_state.moya_choice == current_quiz['answer']:
-                    st.success("🎉 Moya a trouvé la bonne réponse ! +1 point")
-                else:
-                    st.error("❌ Moya s'est trompé")
+            found = [player for player in quiz.players if quiz.choices[player] == current_quiz['answer']]
+            for player, col in zip(quiz.players, st.columns(len(quiz.players))):
+                with col:
+                    if player in found:
+                        st.success(f"🎉 {player} a trouvé la bonne réponse ! +1 point")
+                    else:
+                        st.error(f"❌ {player} s'est trompé")
             
-            if st.session_state.nafi_choice == current_quiz['answer'] or st.session_state.moya_choice == current_quiz['answer']:
+            if found:
                 st.balloons()
             
             st.write("")
-            if st.session_state.current_question < len(st.session_state.quizzes) - 1:
+            if not quiz.is_last_question:
                 if st.button("➡️ Question suivante", use_container_width=True):
-                    next_question()
+                    quiz.next_question(time.time())
                     st.rerun()
             else:
                 st.info("C'était la dernière question !")
                 if st.button("🏁 Voir les résultats", use_container_width=True):
-                    st.session_state.current_question += 1
+                    quiz.next_question()
                     st.rerun()
 
     else:
-        if 'quiz_saved' not in st.session_state or not st.session_state.quiz_saved:
-            save_session(
-                st.session_state.nafi_score,
-                st.session_state.moya_score,
-                len(st.session_state.quizzes)
-            )
-            st.session_state.quiz_saved = True
+        save_finished_quiz()
         
         st.success("🎊 Quiz terminé !")
         st.write("")
         
         st.markdown("### 🏆 Résultats finaux")
         
-        col1, col2 = st.columns(2)
-        total_questions = len(st.session_state.quizzes)
-        if total_questions > 0:
-            nafi_pct = (st.session_state.nafi_score / total_questions * 100)
-            moya_pct = (st.session_state.moya_score / total_questions * 100)
-        else:
-            nafi_pct = 0
-            moya_pct = 0
-        
-        with col1:
-            st.metric("🔵 Nafi", st.session_state.nafi_score, f"{nafi_pct:.1f}%")
-        with col2:
-            st.metric("🔴 Moya", st.session_state.moya_score, f"{moya_pct:.1f}%")
+        total_questions = len(quiz)
+        for player, col in zip(quiz.players, st.columns(len(quiz.players))):
+            pct = quiz.scores[player] / total_questions * 100 if total_questions > 0 else 0
+            with col:
+                st.metric(f"{badge(player)} {player}", quiz.scores[player], f"{pct:.1f}%")
         
         st.write("")
         
-        if st.session_state.nafi_score > st.session_state.moya_score:
-            st.success("🏆 Nafi gagne !")
-        elif st.session_state.moya_score > st.session_state.nafi_score:
-            st.success("🏆 Moya gagne !")
+        winner = quiz.winner()
+        if winner != TIE:
+            st.success(f"🏆 {winner} gagne !")
         else:
             st.info("🤝 Égalité parfaite !")
 
@@ -429,6 +466,10 @@ elif page == "🎮 Quiz":
     st.divider()
 
     if st.button("🔄 Nouvelle session", use_container_width=True):
-        st.session_state.quiz_saved = False
         reset_quiz(save_current=False)
         st.rerun()
+
+metrics.observe(f"app.rerun.{page.split()[-1].lower()}", time.perf_counter() - rerun_started)
+profiler = st.session_state.pop('active_profiler', None)
+if profiler is not None:
+    st.session_state.last_profile = metrics.finish_profile(profiler)
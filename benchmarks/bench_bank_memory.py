@@ -0,0 +1,50 @@
+import argparse
+import random
+import tracemalloc
+
+from quiz_bank import QUIZZES_PATH, get_bank, load_quizzes
+
+
+def simulate_before(n_sessions, path):
+    sessions = []
+    for _ in range(n_sessions):
+        all_quizzes = load_quizzes(path)
+        quizzes = all_quizzes.copy()
+        random.shuffle(quizzes)
+        sessions.append({'all_quizzes': all_quizzes, 'quizzes': quizzes})
+    return sessions
+
+
+def simulate_after(n_sessions, path):
+    sessions = []
+    for _ in range(n_sessions):
+        bank = get_bank(path)
+        question_ids = bank.ids()
+        random.shuffle(question_ids)
+        sessions.append({'bank_digest': bank.digest, 'question_ids': question_ids})
+    return sessions
+
+
+def measure(simulate, n_sessions, path):
+    tracemalloc.start()
+    sessions = simulate(n_sessions, path)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire de N sessions simulées, avant/après la banque partagée")
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--path', default=QUIZZES_PATH)
+    args = parser.parse_args()
+
+    for label, simulate in (('before', simulate_before), ('after', simulate_after)):
+        current, peak = measure(simulate, args.sessions, args.path)
+        print(f"{label:>6}: {args.sessions} sessions, retained {current / 1024 / 1024:.2f} MiB, "
+              f"peak {peak / 1024 / 1024:.2f} MiB, {current / args.sessions:.0f} B/session")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import os
+import resource
+import tempfile
+import threading
+import time
+
+from sqlalchemy import select, text
+
+SEED_SESSIONS = """
+WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < :n)
+INSERT INTO quiz_sessions (id, session_date, total_questions, winner, quiz_type)
+SELECT x, datetime(1704067200 + x * 3, 'unixepoch') || '.000000', 20, printf('joueur-%06d', x * 7 % :players), 'standard'
+FROM seq
+"""
+
+SEED_PARTICIPANTS = """
+INSERT INTO session_participants (session_id, position, player_name, score, is_winner)
+SELECT id, p.position, printf('joueur-%06d', (id * (7 + 6 * p.position) + p.position) % :players),
+       CASE p.position WHEN 0 THEN 15 ELSE abs(random()) % 15 END, p.position = 0
+FROM quiz_sessions, (SELECT 0 AS position UNION ALL SELECT 1) AS p
+"""
+
+
+class PeakRss:
+    """Samples the process RSS from a background thread (Linux /proc), in MiB."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.page = os.sysconf('SC_PAGE_SIZE')
+        self.peak = self.baseline = self.rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def rss(self):
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self.page / 2**20
+        except OSError:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.rss())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export par lots (CSV/Parquet) d'un historique SQLite de grande taille")
+    parser.add_argument('--sessions', type=int, default=10_000_000)
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--db', help="fichier SQLite à réutiliser (créé et peuplé s'il n'existe pas)")
+    parser.add_argument('--datasets', nargs='+', default=['sessions'], choices=['sessions', 'participants'])
+    parser.add_argument('--formats', nargs='+', default=['csv', 'parquet'], choices=['csv', 'parquet'])
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    path = args.db or os.path.join(tmpdir.name, 'export.db')
+    seeded = os.path.exists(path)
+    os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+    import database
+    from export import export_dataset
+
+    if 'parquet' in args.formats:
+        import pyarrow.parquet  # keep the import cost out of the measurements
+    database.init_db()
+    engine = database.get_engine()
+    if not seeded:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA journal_mode=OFF"))
+            conn.execute(text(SEED_SESSIONS), {'n': args.sessions, 'players': args.players})
+            if 'participants' in args.datasets:
+                conn.execute(text(SEED_PARTICIPANTS), {'players': args.players})
+        print(f"seeded {args.sessions} sessions in {time.perf_counter() - start:.1f} s")
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT count(*) FROM quiz_sessions")).scalar_one()
+        sessions = database.QuizSession
+        tail = tuple(conn.execute(select(sessions.session_date, sessions.id).order_by(sessions.session_date, sessions.id)
+                                  .offset(total - total // 10).limit(1)).one())
+
+    for dataset in args.datasets:
+        for fmt in args.formats:
+            for label, since in (("last 10%", tail), ("full", None)):
+                out = os.path.join(tmpdir.name, f"{dataset}.{fmt}")
+                with PeakRss() as memory:
+                    start = time.perf_counter()
+                    rows, _ = export_dataset(dataset, out, fmt, since, args.batch_size)
+                    elapsed = time.perf_counter() - start
+                print(f"{dataset} {fmt} {label}: {rows} rows in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s), "
+                      f"{os.path.getsize(out) / 2**20:.0f} MiB, "
+                      f"RSS {memory.baseline:.0f} MiB before, peak {memory.peak:.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
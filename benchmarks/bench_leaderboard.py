@@ -0,0 +1,67 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from benchmarks.synthetic import seed_sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classement et historique sur une base peuplée de joueurs et de parties")
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--sessions', type=int, default=1_000_000)
+    parser.add_argument('--db', help="fichier SQLite à réutiliser (créé et peuplé s'il n'existe pas)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rebuild', action='store_true', help="chronométrer aussi rebuild_rollups")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    path = args.db or os.path.join(tmpdir.name, 'leaderboard.db')
+    seeded = os.path.exists(path)
+    os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+    import database
+
+    database.init_db()
+    if not seeded:
+        start = time.perf_counter()
+        seed_sessions(database, args.players, args.sessions)
+        print(f"seeded {args.sessions} sessions for {args.players} players (rollups included) "
+              f"in {time.perf_counter() - start:.1f} s")
+    if args.rebuild:
+        start = time.perf_counter()
+        database.rebuild_rollups()
+        print(f"rebuild_rollups: {time.perf_counter() - start:.1f} s")
+    with database.get_engine().connect() as conn:
+        participants = conn.execute(text("SELECT count(*) FROM session_participants")).scalar_one()
+        deep = conn.execute(text("SELECT session_date, id FROM quiz_sessions ORDER BY session_date, id LIMIT 1 OFFSET :n"),
+                            {'n': participants // 6}).one()
+    print(f"{database.count_sessions()} sessions, {participants} participant rows")
+
+    top = database.get_leaderboard()[0].player_name
+    cases = [
+        ('leaderboard top 20', lambda: database.get_leaderboard()),
+        ('leaderboard 2 players', lambda: database.get_leaderboard((top, 'joueur-000001'))),
+        ('history first page', lambda: database.get_sessions_page()),
+        ('history deep page', lambda: database.get_sessions_page(tuple(deep))),
+        ('player stats', lambda: database.get_player_stats(top)),
+        ('daily trend', lambda: database.get_player_trend(top)),
+        ('category accuracy', lambda: database.get_category_accuracy(top)),
+        ('head to head', lambda: database.get_head_to_head(top, 'joueur-000001')),
+    ]
+    for label, fn in cases:
+        samples = []
+        for _ in range(args.repeat):
+            database.query_cache.invalidate()
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        print(f"{label:>22}: median {statistics.median(samples) * 1000:9.2f} ms, min {min(samples) * 1000:9.2f} ms")
+    database.get_engine().dispose()
+    tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
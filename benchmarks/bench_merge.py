@@ -0,0 +1,57 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_questions
+from quiz_import import merge_banks, write_bank
+
+
+def edited(questions, step):
+    """The next version of a bank: visited in a strided order, with some questions edited, dropped and added."""
+    n = len(questions)
+    while n % step == 0:
+        step += 1
+    for k in range(n):
+        i = k * step % n
+        if i % 50 == 0:
+            continue
+        question = questions[i]
+        if i % 20 == 0:
+            question = {**question, 'answer': question['options'][0]}
+        yield question
+        if i % 100 == 1:
+            yield {**question, 'question': f"Nouvelle question n°{i} ?"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fusion de banques de questions à grande échelle")
+    parser.add_argument('--questions', type=int, default=1_000_000)
+    parser.add_argument('--memory', action='store_true', help="mesurer aussi le pic mémoire (tracemalloc, bien plus lent)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old, new, out = (os.path.join(tmpdir, name) for name in ("old.json", "new.json", "merged.json"))
+        questions = make_questions(args.questions)
+        write_bank(questions, old)
+        write_bank(edited(questions, 7919), new)
+        del questions
+
+        start = time.perf_counter()
+        report = merge_banks([old, new], out)
+        elapsed = time.perf_counter() - start
+        print(f"{args.questions} questions merged in {elapsed:.1f} s ({args.questions / elapsed:,.0f}/s), "
+              f"output {os.path.getsize(out) / 2**20:.0f} MiB")
+        if args.memory:
+            tracemalloc.start()
+            merge_banks([old, new])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"peak {peak / 2**20:.0f} MiB traced during a report-only merge")
+        print(f"{report.added} added, {report.removed} removed, {report.changed} changed, "
+              f"{report.unchanged} unchanged -> {report.total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import itertools
+import time
+
+from benchmarks.synthetic import make_sentences
+from quiz_import import normalize_text
+from search import DUPLICATE_THRESHOLD, SHINGLE_SIZE, near_duplicates
+
+
+def shingles(text):
+    text = normalize_text(text).ljust(SHINGLE_SIZE)
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def brute_force(texts, threshold):
+    sets = [shingles(t) for t in texts]
+    return {(i, j) for i, j in itertools.combinations(range(len(texts)), 2) if jaccard(sets[i], sets[j]) >= threshold}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Détection de quasi-doublons MinHash/LSH à grande échelle")
+    parser.add_argument('--questions', type=int, default=1_000_000)
+    parser.add_argument('--exact-sample', type=int, default=3000, help="taille du contrôle exhaustif O(n²)")
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+    args = parser.parse_args()
+
+    texts, _ = make_sentences(args.exact_sample, seed=1, duplicate_rate=0.05)
+    start = time.perf_counter()
+    expected = brute_force(texts, args.threshold)
+    brute = time.perf_counter() - start
+    start = time.perf_counter()
+    found = {(i, j) for i, j, _ in near_duplicates(texts, args.threshold)}
+    lsh = time.perf_counter() - start
+    print(f"{args.exact_sample} questions: brute force {brute:.1f} s, LSH {lsh:.2f} s, "
+          f"recall {len(found & expected) / max(len(expected), 1):.3f} on {len(expected)} true pairs, "
+          f"{len(found - expected)} pairs below the exact threshold")
+
+    texts, injected = make_sentences(args.questions, seed=2)
+    sets = {i: shingles(texts[i]) for pair in injected for i in pair}
+    injected = {pair for pair in injected if jaccard(sets[pair[0]], sets[pair[1]]) >= args.threshold}
+    start = time.perf_counter()
+    pairs = near_duplicates(texts, args.threshold)
+    elapsed = time.perf_counter() - start
+    found = {(i, j) for i, j, _ in pairs}
+    print(f"{args.questions} questions in {elapsed:.1f} s ({args.questions / elapsed:,.0f}/s): {len(pairs)} pairs, "
+          f"recall {len(found & injected) / max(len(injected), 1):.3f} on {len(injected)} injected pairs above threshold")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+
+def legacy_save_session(database, nafi_score, moya_score, total_questions):
+    db = database.SessionLocal()
+    try:
+        winner = "Nafi" if nafi_score > moya_score else "Moya" if moya_score > nafi_score else "Égalité"
+        session = database.QuizSession(total_questions=total_questions, winner=winner)
+        session.participants = [
+            database.SessionParticipant(position=0, player_name="Nafi", score=nafi_score, is_winner=winner == "Nafi"),
+            database.SessionParticipant(position=1, player_name="Moya", score=moya_score, is_winner=winner == "Moya"),
+        ]
+        db.add(session)
+        db.commit()
+        for name, score in (("Nafi", nafi_score), ("Moya", moya_score)):
+            stats = db.query(database.PlayerStats).filter(database.PlayerStats.player_name == name).first()
+            if not stats:
+                stats = database.PlayerStats(player_name=name, total_games=0, total_wins=0, total_score=0)
+                db.add(stats)
+            stats.total_games += 1
+            stats.total_score += score
+            if winner == name:
+                stats.total_wins += 1
+            db.commit()
+    finally:
+        db.close()
+
+
+def expected_stats(scores):
+    expected = {name: (len(scores), 0, 0) for name in ("Nafi", "Moya")}
+    for nafi, moya in scores:
+        for name, score, other in (("Nafi", nafi, moya), ("Moya", moya, nafi)):
+            games, wins, total = expected[name]
+            expected[name] = (games, wins + (score > other), total + score)
+    return expected
+
+
+def snapshot_rollups(database):
+    with database.SessionLocal() as db:
+        return {
+            model.__tablename__: sorted(db.execute(select(*(c for c in model.__table__.c if c.name != 'id'))).all())
+            for model, _ in database.ROLLUPS
+        }
+
+
+def run(label, save, database, workers, games):
+    database.Base.metadata.drop_all(bind=database.get_engine())
+    database.Base.metadata.create_all(bind=database.get_engine())
+    rng = random.Random(0)
+    scores = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(workers * games)]
+
+    def play(chunk):
+        errors = 0
+        for nafi, moya in chunk:
+            try:
+                save(nafi, moya, 20)
+            except Exception:
+                errors += 1
+        return errors
+
+    chunks = [scores[i::workers] for i in range(workers)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        errors = sum(pool.map(play, chunks))
+    elapsed = time.perf_counter() - start
+
+    with database.SessionLocal() as db:
+        stats = {s.player_name: (s.total_games, s.total_wins, s.total_score) for s in db.query(database.PlayerStats)}
+        sessions = db.query(database.QuizSession).count()
+    database.query_cache.invalidate()
+    ranked = {r.player_name: (r.total_games, r.total_wins, r.total_score) for r in database.get_leaderboard()}
+    rollups = snapshot_rollups(database)
+    database.rebuild_rollups(batch_size=max(1, len(scores) // 7))
+    exact = stats == ranked == expected_stats(scores) and sessions == len(scores) and rollups == snapshot_rollups(database)
+    print(f"{label:>7}: {len(scores)} games, {workers} workers, {len(scores) / elapsed:8.1f} games/s, "
+          f"{errors} errors, {sessions} sessions stored, stats {'exact' if exact else 'MISMATCH'} {stats}")
+    return exact
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Débit de save_session sous fins de parties concurrentes, avec vérification des totaux")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--games', type=int, default=200, help="parties par worker")
+    parser.add_argument('--url', help="DATABASE_URL (par défaut : SQLite temporaire)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.url or f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    import database
+
+    run('legacy', lambda n, m, t: legacy_save_session(database, n, m, t), database, args.workers, args.games)
+    exact = run('current', lambda n, m, t: database.save_session({"Nafi": n, "Moya": m}, t), database,
+                args.workers, args.games)
+    database.get_engine().dispose()
+    tmpdir.cleanup()
+    if not exact:
+        sys.exit("save_session a perdu des mises à jour sous concurrence")
+
+
+if __name__ == '__main__':
+    main()
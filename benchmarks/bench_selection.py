@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import make_questions
+from quiz_bank import QUIZZES_PATH, QuizBank, load_quizzes
+
+
+def filter_scan(all_quizzes, category, difficulty):
+    filtered = all_quizzes
+    if category != "Toutes":
+        filtered = [q for q in filtered if q.get('category') == category]
+    if difficulty != "Toutes":
+        filtered = [q for q in filtered if q.get('difficulty') == difficulty]
+    filtered = filtered.copy()
+    random.shuffle(filtered)
+    categories = ["Toutes"] + sorted(list(set([q.get('category', 'Toutes') for q in all_quizzes])))
+    return filtered, categories
+
+
+def filter_index(bank, category, difficulty):
+    return bank.shuffled_ids(category, difficulty), ["Toutes"] + bank.categories
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(label, questions, repeat):
+    start = time.perf_counter()
+    bank = QuizBank(questions, digest=label)
+    build = time.perf_counter() - start
+    category = bank.categories[0]
+    difficulty = questions[0]['difficulty']
+    scan = best_of(lambda: filter_scan(questions, category, difficulty), repeat)
+    index = best_of(lambda: filter_index(bank, category, difficulty), repeat)
+    bucket = bank.counts[category][difficulty]
+    print(f"{label:>10} | {len(questions):>9} q | bucket {bucket:>8} | build {build * 1000:9.1f} ms | "
+          f"scan {scan * 1000:9.3f} ms | index {index * 1000:9.3f} ms | x{scan / index:6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence de sélection : filtre linéaire vs index catégorie/difficulté")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    run('quizzes', load_quizzes(QUIZZES_PATH), args.repeat)
+    for n in args.sizes:
+        run('synthetic', make_questions(n), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
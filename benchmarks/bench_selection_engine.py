@@ -0,0 +1,58 @@
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import make_questions
+from quiz_bank import QuizBank
+from selection import Selector
+
+
+def synthetic_stats(n, rng):
+    stats = []
+    for question_id in range(n):
+        answers = rng.randint(0, 50)
+        stats.append((question_id, answers, rng.randint(0, answers)))
+    return stats
+
+
+def rate(fn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / (time.perf_counter() - start)
+
+
+def run(n, draws, quiz_length):
+    rng = random.Random(0)
+    bank = QuizBank(make_questions(n), digest=f"synthetic-{n}")
+
+    start = time.perf_counter()
+    selector = Selector(bank, synthetic_stats(n, rng), [("Nafi", 1000, 700), ("Moya", 1000, 600)])
+    weights = time.perf_counter() - start
+    start = time.perf_counter()
+    selector.table()
+    build = time.perf_counter() - start
+
+    draw_rate = rate(lambda: selector.draw(rng=rng), draws)
+    sample_rate = rate(lambda: selector.sample(k=quiz_length, rng=rng), max(1, draws // (quiz_length * 10)))
+    category = bank.categories[0]
+    selector.table(category, "Facile")
+    bucket_rate = rate(lambda: selector.sample(category, "Facile", k=quiz_length, rng=rng), 200)
+    print(f"{n:>9} q | weights {weights * 1000:8.1f} ms | alias build {build * 1000:8.1f} ms | "
+          f"{draw_rate:>10,.0f} draws/s | {sample_rate:>8,.0f} quizzes/s (k={quiz_length}) | "
+          f"{bucket_rate:>8,.0f} filtered quizzes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du moteur de sélection adaptative")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[134, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--draws', type=int, default=200_000)
+    parser.add_argument('--quiz-length', type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        run(n, args.draws, args.quiz_length)
+
+
+if __name__ == '__main__':
+    main()
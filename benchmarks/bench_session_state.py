@@ -0,0 +1,58 @@
+import argparse
+import random
+import tracemalloc
+
+from benchmarks.synthetic import make_questions
+from game import GameSession
+from quiz_bank import ALL
+
+SCALARS = {
+    'current_question': 0, 'nafi_score': 0, 'moya_score': 0, 'answered': False, 'quiz_saved': False,
+    'nafi_choice': None, 'moya_choice': None, 'question_start_time': None, 'question_shown_at': None,
+    'selected_category': ALL, 'selected_difficulty': ALL, 'timer_enabled': False, 'timer_duration': 30,
+}
+
+
+def dict_copies(questions):
+    quizzes = questions.copy()
+    random.shuffle(quizzes)
+    return dict(SCALARS, quizzes=quizzes)
+
+
+def id_list(questions):
+    question_ids = list(range(len(questions)))
+    random.shuffle(question_ids)
+    return dict(SCALARS, question_ids=question_ids, answer_times={})
+
+
+def game_session(questions):
+    question_ids = list(range(len(questions)))
+    random.shuffle(question_ids)
+    return GameSession(question_ids, 'digest')
+
+
+def bytes_per_session(build, questions, sessions):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(questions) for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Octets par session : copies de dicts, liste d'IDs, GameSession compact")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument('--sessions', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'questions':>10} | {'dict copies':>12} | {'id list':>12} | {'GameSession':>12}")
+    for n in args.sizes:
+        questions = make_questions(n)
+        row = [bytes_per_session(build, questions, args.sessions) for build in (dict_copies, id_list, game_session)]
+        print(f"{n:>10} | " + " | ".join(f"{b:>10,.0f} B" for b in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_MODULES = "import database, game, quiz_bank, selection, telemetry"
+
+RENDER_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+first = time.perf_counter() - start
+assert not at.exception, at.exception
+reruns = []
+for _ in range(int(sys.argv[2])):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({'first_render_ms': first * 1000, 'rerun_ms': sorted(reruns)[len(reruns) // 2] * 1000}))
+"""
+
+
+def import_times(statement, env):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not name.startswith('  '):
+            top_level.append((name.strip(), int(cumulative_us)))
+    return sum(cumulative for _, cumulative in top_level), sorted(top_level, key=lambda r: -r[1])
+
+
+def render_times(env, reruns):
+    result = subprocess.run([sys.executable, '-c', RENDER_SCRIPT, os.path.join(ROOT, 'app.py'), str(reruns)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage à froid : -X importtime et premier rendu de app.py")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'startup.db')}")
+        total, top_level = import_times(APP_MODULES, env)
+        print(f"imports ({APP_MODULES[7:]}): {total / 1000:.1f} ms")
+        for name, cumulative in top_level[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+        times = render_times(env, args.reruns)
+        print(f"first render: {times['first_render_ms']:.1f} ms, median rerun: {times['rerun_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
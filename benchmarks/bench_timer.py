@@ -0,0 +1,123 @@
+import argparse
+import ast
+import os
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'app.py')
+
+HARNESS = '''
+import streamlit as st
+from quiz_bank import get_bank
+from telemetry import record_results
+
+
+class time:
+    """Simulated clock, advanced by the benchmark between ticks."""
+    @staticmethod
+    def time():
+        return st.session_state.sim['now']
+
+
+st.session_state.sim['script_runs'] += 1
+game_bank = get_bank()
+quiz = st.session_state.quiz
+
+{source}
+
+countdown()
+'''
+
+
+def fragment_script():
+    """The real countdown fragment and validate_answers from app.py, on a simulated clock."""
+    with open(APP, encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source)
+    wanted = {'TIMER_TICK_SECONDS', 'validate_answers', 'countdown'}
+    segments = []
+    for node in tree.body:
+        names = {node.name} if isinstance(node, ast.FunctionDef) else {
+            target.id for target in getattr(node, 'targets', ()) if isinstance(target, ast.Name)}
+        if names & wanted:
+            first = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', ())])
+            segments.append('\n'.join(source.splitlines()[first - 1:node.end_lineno]))
+    return HARNESS.format(source='\n\n'.join(segments))
+
+
+def cpu(at):
+    start = time.process_time()
+    at.run()
+    assert not at.exception, at.exception
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Réexécutions complètes et CPU par minute de partie chronométrée, avant/après le fragment")
+    parser.add_argument('--timer', type=int, default=30, help="durée du chronomètre (s)")
+    parser.add_argument('--tick', type=float, default=1.0)
+    parser.add_argument('--minutes', type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmpdir, 'timer.db')}")
+        from game import GameSession
+        from quiz_bank import get_bank
+        from selection import select_questions
+
+        app = AppTest.from_file(APP, default_timeout=60).run()
+        app.sidebar.checkbox[0].check().run()
+
+        bank = get_bank()
+        quiz = GameSession(select_questions(bank), bank.digest)
+        quiz.timer_enabled = True
+        quiz.timer_duration = args.timer
+        fragment = AppTest.from_string(fragment_script(), default_timeout=60)
+        sim = {'now': 0.0, 'script_runs': 0}
+        fragment.session_state['quiz'] = quiz
+        fragment.session_state['sim'] = sim
+        now = 0.0
+        quiz.show_question(now)
+
+        before_runs = after_runs = ticks = 0
+        before_cpu = after_cpu = 0.0
+        fragment_cpu = []
+        while now < args.minutes * 60:
+            now += args.tick
+            ticks += 1
+            if quiz.remaining(now) is not None and not quiz.answered:
+                # Without the fragment, a live countdown needs a full rerun on every tick it is shown.
+                before_runs += 1
+                before_cpu += cpu(app)
+            runs = sim['script_runs']
+            sim['now'] = now
+            tick_cpu = cpu(fragment)
+            app_reruns = sim['script_runs'] - runs - 1
+            if app_reruns:
+                after_runs += app_reruns
+                after_cpu += sum(cpu(app) for _ in range(app_reruns))
+            else:
+                fragment_cpu.append(tick_cpu)
+            after_cpu += tick_cpu
+            if quiz.answered:
+                quiz.next_question(now)
+                if quiz.finished:
+                    quiz.restart(select_questions(bank))
+                quiz.show_question(now)
+
+    fragment_cpu.sort()
+    minutes = args.minutes
+    print(f"{ticks} ticks of {args.tick:g} s, {args.timer} s timer; "
+          f"median countdown fragment run: {fragment_cpu[len(fragment_cpu) // 2] * 1000:.1f} ms CPU")
+    print(f"before (full rerun per tick): {before_runs / minutes:.0f} full reruns/min, "
+          f"{before_cpu / minutes * 1000:.0f} ms CPU/min")
+    print(f"after (fragment per tick):    {after_runs / minutes:.0f} full reruns/min, "
+          f"{after_cpu / minutes * 1000:.0f} ms CPU/min")
+
+
+if __name__ == '__main__':
+    main()
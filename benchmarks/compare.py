@@ -0,0 +1,100 @@
+import argparse
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.2
+MAX_NOISE = 0.5
+
+
+def slowdown(baseline, current, better):
+    """Relative change, positive when ``current`` is worse than ``baseline``."""
+    if baseline == 0:
+        return 0.0 if current == 0 else float('inf')
+    change = (current - baseline) / baseline
+    return change if better == 'lower' else -change
+
+
+def noise(result):
+    """Spread of a metric over the suite's independent runs, in its own unit (0 for single-run reports)."""
+    runs = result.get('runs') or [result['value']]
+    return max(runs) - min(runs)
+
+
+def compare(baseline, current, ignore=()):
+    """Return ``(scale, metric, baseline, current, unit, slowdown, noise)`` rows for metrics present in both reports.
+
+    ``noise`` is the baseline's run-to-run spread, capped at MAX_NOISE of its
+    value: a change no bigger than that is within what the same tree already
+    varies by. The current report's own spread is not used, so a regression
+    cannot widen the tolerance it is judged by.
+    """
+    rows = []
+    for scale, metrics in current['results'].items():
+        reference = baseline['results'].get(scale, {})
+        for name, result in metrics.items():
+            if name in ignore or name not in reference:
+                continue
+            before = reference[name]['value']
+            rows.append((scale, name, before, result['value'], result['unit'],
+                         slowdown(before, result['value'], result['better']),
+                         min(noise(reference[name]), MAX_NOISE * abs(before))))
+    return rows
+
+
+def merge_reports(reports):
+    """Combine reports of the same tree: each metric keeps its best value and all the runs behind it."""
+    merged = {'meta': reports[0]['meta'], 'results': {}}
+    for report in reports:
+        for scale, metrics in report['results'].items():
+            into = merged['results'].setdefault(scale, {})
+            for name, result in metrics.items():
+                if name not in into:
+                    into[name] = dict(result, runs=list(result.get('runs') or [result['value']]))
+                    continue
+                kept = into[name]
+                pick = min if result['better'] == 'lower' else max
+                kept['value'] = pick(kept['value'], result['value'])
+                kept['runs'] += result.get('runs') or [result['value']]
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare deux résultats de benchmarks.suite et signale les régressions")
+    parser.add_argument('baseline')
+    parser.add_argument('current', nargs='+',
+                        help="un ou plusieurs résultats de la version testée, fusionnés (relancer pour écarter une passe lente)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="dégradation relative tolérée (0.2 = 20 %%)")
+    parser.add_argument('--ignore', nargs='*', default=[], help="métriques à ne pas comparer")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    reports = []
+    for path in args.current:
+        with open(path, encoding='utf-8') as f:
+            reports.append(json.load(f))
+    current = merge_reports(reports)
+
+    print(f"{baseline['meta'].get('revision')} -> {current['meta'].get('revision')} "
+          f"(seuil {args.threshold:.0%})")
+    print(f"{'échelle':<7} {'métrique':<32} {'référence':>14}    {'actuel':>14} {'bruit':>12} {'unité':<8} "
+          f"{'dégradation':>11}")
+    regressions = 0
+    for scale, name, before, after, unit, change, spread in compare(baseline, current, args.ignore):
+        flag = ''
+        if abs(after - before) <= spread:
+            flag = '  (bruit)' if abs(change) > args.threshold else ''
+        elif change > args.threshold:
+            flag = '  RÉGRESSION'
+            regressions += 1
+        elif change < -args.threshold:
+            flag = '  amélioration'
+        print(f"{scale:<7} {name:<32} {before:>14,.3f} -> {after:>14,.3f} {spread:>12,.3f} {unit:<8} "
+              f"{change:>+11.1%}{flag}")
+    if regressions:
+        sys.exit(f"{regressions} régression(s) au-delà de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
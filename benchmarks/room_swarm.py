@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from websockets.asyncio.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def client(url, room, player, size, questions, timer, think, stats, rng, connect_slots):
+    async with connect_slots:
+        ws = await connect(url, open_timeout=60, max_queue=64)
+    async with ws:
+        await ws.send(json.dumps({'type': 'join', 'room': room, 'player': player, 'size': size,
+                                  'questions': questions, 'timer': timer}))
+        pending = sent_at = None
+        expected = 0
+
+        async def answer(options):
+            nonlocal sent_at
+            await asyncio.sleep(rng.uniform(0, think))
+            sent_at = time.perf_counter()
+            await ws.send(json.dumps({'type': 'answer', 'option': rng.choice(options)}))
+
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message['type'] == 'question':
+                    # Each index must arrive once, in order: a repeat means the room was started twice.
+                    if message['index'] != expected or pending is not None:
+                        stats['anomalies'] += 1
+                    expected = message['index'] + 1
+                    pending = asyncio.create_task(answer(message['options']))
+                elif message['type'] == 'result':
+                    if pending is not None:
+                        pending.cancel()
+                        pending = None
+                    if message['choices'].get(player) is None:
+                        stats['expired'].add((room, message['index']))
+                    elif sent_at is not None:
+                        key = (room, message['index'])
+                        latency = time.perf_counter() - sent_at
+                        stats['latencies'][key] = min(latency, stats['latencies'].get(key, latency))
+                    sent_at = None
+                elif message['type'] in ('finished', 'error'):
+                    return message['type'] == 'finished'
+        finally:
+            if pending is not None:
+                pending.cancel()
+    return False
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float('nan')
+
+
+async def swarm(url, rooms, size, questions, timer, think, connect_concurrency):
+    rng = random.Random(0)
+    stats = {'latencies': {}, 'expired': set(), 'anomalies': 0}
+    slots = asyncio.Semaphore(connect_concurrency)
+    tasks = [
+        client(url, f"swarm-{r}", f"joueur-{p}", size, questions, timer, think, stats, random.Random(rng.random()), slots)
+        for r in range(rooms) for p in range(size)
+    ]
+    start = time.perf_counter()
+    finished = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [f for f in finished if isinstance(f, Exception)]
+    done = sum(1 for f in finished if f is True) // size
+    values = list(stats['latencies'].values())
+    print(f"{rooms} rooms x {size} players x {questions} questions in {elapsed:.1f} s: {done} games finished, "
+          f"{len(errors)} client errors, {stats['anomalies']} out-of-order questions")
+    if timer:
+        print(f"{len(stats['expired'])} of {rooms * questions} questions scored by the {timer:g} s server deadline")
+    print(f"answer-to-result latency over {len(values)} questions: p50 {percentile(values, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(values, 0.99) * 1000:.1f} ms, max {max(values, default=0) * 1000:.1f} ms")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("le serveur de salles n'a pas démarré")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Essaim de clients WebSocket contre le serveur de salles")
+    parser.add_argument('--url', help="serveur existant (par défaut : lance rooms.py localement)")
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--size', type=int, default=2)
+    parser.add_argument('--questions', type=int, default=5)
+    parser.add_argument('--timer', type=float, default=0, help="chronomètre par question (s, 0 = sans)")
+    parser.add_argument('--think', type=float, default=0.5, help="temps de réflexion maximal (s)")
+    parser.add_argument('--connect-concurrency', type=int, default=200)
+    args = parser.parse_args()
+
+    server = None
+    tmpdir = tempfile.TemporaryDirectory()
+    url = args.url
+    if url is None:
+        port = free_port()
+        env = dict(os.environ, DATABASE_URL=os.getenv('DATABASE_URL', f"sqlite:///{os.path.join(tmpdir.name, 'rooms.db')}"))
+        server = subprocess.Popen([sys.executable, 'rooms.py', '--port', str(port)], cwd=ROOT, env=env,
+                                  stdout=subprocess.DEVNULL)
+        wait_for_port(port)
+        url = f"ws://127.0.0.1:{port}"
+    try:
+        asyncio.run(swarm(url, args.rooms, args.size, args.questions, args.timer, args.think,
+                          args.connect_concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game import PLAYERS, TIE, GameSession
+
+OPTIONS = ("A", "B", "C", "D")
+
+
+def play(seed, games, questions, timer_duration, accuracy):
+    """Play synthetic games on the headless engine and check scores against an independent tally.
+
+    Late answers are still sent to ``choose()``, which must refuse them so they are never scored.
+    """
+    rng = random.Random(seed)
+    question_ids = range(questions)
+    session = GameSession()
+    session.timer_enabled = True
+    session.timer_duration = timer_duration
+    mismatches = 0
+    for _ in range(games):
+        session.restart(question_ids)
+        expected = dict.fromkeys(PLAYERS, 0)
+        now = 0.0
+        while not session.finished:
+            session.show_question(now)
+            correct = OPTIONS[rng.randrange(4)]
+            for player in PLAYERS:
+                latency = rng.expovariate(1 / (timer_duration / 3))
+                option = correct if rng.random() < accuracy else rng.choice(OPTIONS)
+                in_time = latency < timer_duration
+                if session.choose(player, option, now + latency) != in_time:
+                    mismatches += 1
+                if in_time:
+                    expected[player] += option == correct
+            now += timer_duration
+            if session.waiting_for:
+                assert session.is_expired(now)
+            session.validate(correct)
+            session.next_question(now)
+        best = max(expected.values())
+        leaders = [player for player in PLAYERS if expected[player] == best]
+        if session.scores != expected or session.winner() != (leaders[0] if len(leaders) == 1 else TIE):
+            mismatches += 1
+    return games, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur de parties sur le moteur sans interface, réparti sur un pool de processus")
+    parser.add_argument('--games', type=int, default=200_000)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--timer', type=float, default=30.0)
+    parser.add_argument('--accuracy', type=float, default=0.6)
+    args = parser.parse_args()
+
+    chunks = [args.games // args.workers + (i < args.games % args.workers) for i in range(args.workers)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        results = list(pool.map(play, range(args.workers), chunks, [args.questions] * args.workers,
+                                [args.timer] * args.workers, [args.accuracy] * args.workers))
+    elapsed = time.perf_counter() - start
+    games = sum(g for g, _ in results)
+    mismatches = sum(m for _, m in results)
+    print(f"{games:,} games x {args.questions} questions on {args.workers} workers in {elapsed:.1f} s: "
+          f"{games / elapsed * 60:,.0f} games/min, {games * args.questions / elapsed:,.0f} questions/s, "
+          f"{mismatches} scoring mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (questions in the bank, players, stored sessions, save_session calls)
+SCALES = {
+    'small': (1_000, 100, 1_000, 200),
+    'medium': (100_000, 10_000, 100_000, 500),
+    'large': (1_000_000, 100_000, 1_000_000, 1_000),
+}
+GET_ALL_SESSIONS_LIMIT = 20_000
+MIN_TIME = 0.5
+LOWER, HIGHER = 'lower', 'higher'
+
+
+def best_time(fn, repeat, number=1, min_time=MIN_TIME):
+    """Best wall time of one call over rounds of ``number`` calls: the least noisy estimate.
+
+    Runs at least ``repeat`` rounds and keeps going for ``min_time`` seconds, so
+    fast calls are sampled across the CPU's slow and fast spells instead of one.
+    The collector is off while timing, as in timeit, so when a full collection
+    happens to land does not decide the result.
+    """
+    best = float('inf')
+    rounds = 0
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        while rounds < repeat or time.perf_counter() - started < min_time:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+            rounds += 1
+    finally:
+        gc.enable()
+    return best
+
+
+def batch_rate(fn, calls):
+    """Calls per second over one timed pass of ``calls`` calls: slow calls (locks, fsync stalls) count."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return calls / (time.perf_counter() - start)
+
+
+class Results(dict):
+    def add(self, name, value, unit, better=LOWER):
+        self[name] = {'value': round(value, 6), 'unit': unit, 'better': better}
+        print(f"  {name:<32} {value:>14,.3f} {unit}", file=sys.stderr)
+
+
+def bench_bank(results, questions, tmpdir, repeat):
+    import quiz_bank
+    from game import GameSession
+    from quiz_import import write_bank
+    from selection import Selector
+
+    path = os.path.join(tmpdir, 'quizzes.json')
+    write_bank(questions, path)
+    results.add('load_quizzes_ms', best_time(lambda: quiz_bank.load_quizzes(path), repeat) * 1000, 'ms')
+    results.add('compile_bank_ms', best_time(lambda: quiz_bank.compile_bank(path), repeat) * 1000, 'ms')
+
+    def reopen():
+        quiz_bank._banks.clear()
+        return quiz_bank.get_bank(path)
+
+    results.add('get_bank_cold_ms', best_time(reopen, repeat) * 1000, 'ms')
+    bank = reopen()
+    results.add('get_bank_warm_us', best_time(lambda: quiz_bank.get_bank(path), repeat, 100) * 1e6, 'us')
+    results.add('index_build_ms', best_time(lambda: quiz_bank.QuizBank(questions, 'suite'), max(1, repeat // 2)) * 1000, 'ms')
+
+    category, difficulty = bank.categories[0], quiz_bank.DIFFICULTIES[0]
+    results.add('filter_ids_us', best_time(lambda: bank.filter_ids(category, difficulty), repeat, 10) * 1e6, 'us')
+    selector = Selector(bank)
+    selector.sample(category, difficulty, k=10)
+    results.add('select_questions_us', best_time(lambda: selector.sample(category, difficulty, k=10), repeat, 100) * 1e6, 'us')
+
+    sessions = 20
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [GameSession(selector.sample(), bank.digest) for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    results.add('session_bytes', (after - before) / sessions, 'B')
+
+
+def bench_database(results, players, stored, saves, repeat):
+    from sqlalchemy import select
+
+    import database
+    from benchmarks.synthetic import CATEGORIES, seed_sessions
+
+    database.init_db()
+    seed_sessions(database, players, stored)
+    results.add('rebuild_rollups_ms', best_time(database.rebuild_rollups, repeat) * 1000, 'ms')
+
+    # Writes change the tables they measure, so each is one timed pass over fresh, pre-generated inputs.
+    rng = random.Random(0)
+    names = [f"joueur-{i:06d}" for i in range(players)]
+    games = []
+    for _ in range(saves):
+        scores = {player: rng.randint(0, 20) for player in rng.sample(names, 2)}
+        answers = [(player, rng.choice(CATEGORIES), rng.random() < 0.5) for player in scores for _ in range(20)]
+        games.append((scores, answers))
+    games = iter(games)
+
+    def save():
+        scores, answers = next(games)
+        database.save_session(scores, 20, answers=answers)
+
+    results.add('save_session_per_s', batch_rate(save, saves), 'games/s', HIGHER)
+
+    updates = iter([(rng.choice(names), rng.randint(0, 20), rng.random() < 0.5) for _ in range(saves)])
+
+    def update():
+        with database.SessionLocal() as db, db.begin():
+            database.update_player_stats(db, *next(updates))
+
+    results.add('update_player_stats_per_s', batch_rate(update, saves), 'ops/s', HIGHER)
+
+    def uncached(fn):
+        def run():
+            database.query_cache.invalidate()
+            return fn()
+        return run
+
+    top = database.get_leaderboard()[0].player_name
+    results.add('get_leaderboard_ms', best_time(uncached(database.get_leaderboard), repeat, 10) * 1000, 'ms')
+    results.add('get_leaderboard_players_ms',
+                best_time(uncached(lambda: database.get_leaderboard((top, names[1]))), repeat, 10) * 1000, 'ms')
+    results.add('history_first_page_ms', best_time(uncached(database.get_sessions_page), repeat, 10) * 1000, 'ms')
+    sessions = database.QuizSession
+    with database.SessionLocal() as db:
+        oldest = tuple(db.execute(select(sessions.session_date, sessions.id).order_by(sessions.session_date, sessions.id)
+                                  .offset(database.HISTORY_PAGE_SIZE).limit(1)).one())
+    results.add('history_last_page_ms', best_time(uncached(lambda: database.get_sessions_page(oldest)), repeat, 10) * 1000,
+                'ms')
+    results.add('count_sessions_ms', best_time(uncached(database.count_sessions), repeat, 10) * 1000, 'ms')
+    results.add('player_trend_ms', best_time(uncached(lambda: database.get_player_trend(top)), repeat, 10) * 1000, 'ms')
+    if stored + saves <= GET_ALL_SESSIONS_LIMIT:
+        results.add('get_all_sessions_ms', best_time(database.get_all_sessions, max(1, repeat // 2)) * 1000, 'ms')
+
+
+def run_scale(scale, repeat):
+    from benchmarks.synthetic import make_questions
+
+    questions, players, stored, saves = SCALES[scale]
+    results = Results()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_bank(results, make_questions(questions), tmpdir, repeat)
+        bench_database(results, players, stored, saves, repeat)
+    return results
+
+
+def best_of_runs(runs):
+    """Each metric's best value over separate runs, plus every run's value, from which compare derives its noise."""
+    merged = {}
+    for name, result in runs[0].items():
+        values = [run[name]['value'] for run in runs]
+        merged[name] = dict(result, value=min(values) if result['better'] == LOWER else max(values), runs=values)
+    return merged
+
+
+def git_revision():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return result.stdout.strip() + ('-dirty' if dirty else '') if result.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks des chemins critiques, résultats en JSON")
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=5, help="processus indépendants par échelle")
+    parser.add_argument('-o', '--output', help="fichier JSON des résultats (par défaut : bench-<révision>.json)")
+    parser.add_argument('--run-scale', choices=list(SCALES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scale:
+        json.dump(run_scale(args.run_scale, args.repeat), sys.stdout)
+        return
+
+    import numpy
+    import sqlalchemy
+
+    revision = git_revision()
+    report = {
+        'meta': {
+            'revision': revision,
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'numpy': numpy.__version__,
+            'repeat': args.repeat,
+            'runs': args.runs,
+            'scales': {scale: dict(zip(('questions', 'players', 'sessions', 'saves'), SCALES[scale]))
+                       for scale in args.scales},
+        },
+        'results': {},
+    }
+    for scale in args.scales:
+        runs = []
+        for run in range(args.runs):
+            print(f"[{scale} {run + 1}/{args.runs}]", file=sys.stderr)
+            # One process and one fresh SQLite file per run: no module state or page cache carries over,
+            # and the runs are far enough apart to see CPU frequency and neighbour noise change.
+            with tempfile.TemporaryDirectory() as tmpdir:
+                env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'suite.db')}")
+                result = subprocess.run([sys.executable, '-m', 'benchmarks.suite', '--run-scale', scale,
+                                         '--repeat', str(args.repeat)], cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                                        text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        report['results'][scale] = best_of_runs(runs)
+
+    output = args.output or f"bench-{revision or 'local'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats écrits dans {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+
+from quiz_bank import DIFFICULTIES
+
+CATEGORIES = ["Général", "Prophètes", "Sourates", "Fiqh", "Sira", "Histoire"]
+
+
+def make_questions(n, seed=0):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(n):
+        options = [f"Option {i}-{k}" for k in range(4)]
+        questions.append({
+            'question': f"Question synthétique n°{i} ?",
+            'options': options,
+            'answer': options[rng.randrange(4)],
+            'category': rng.choice(CATEGORIES),
+            'difficulty': rng.choice(DIFFICULTIES),
+        })
+    return questions
+
+
+def seed_sessions(database, players, sessions, seed=0, batch=50_000, max_players=4):
+    """Fill the raw session tables with synthetic finished games, then rebuild the rollups from them."""
+    rng = random.Random(seed)
+    names = [f"joueur-{i:06d}" for i in range(players)]
+    engine = database.get_engine()
+    start = datetime(2024, 1, 1)
+    step = timedelta(days=365) / max(sessions, 1)
+    with engine.begin() as conn:
+        for first in range(0, sessions, batch):
+            session_rows, participant_rows, category_rows = [], [], []
+            for session_id in range(first + 1, min(first + batch, sessions) + 1):
+                seated = rng.sample(names, rng.randint(2, max_players))
+                scores = {player: rng.randint(0, 20) for player in seated}
+                winner = database.session_winner(scores)
+                session_rows.append({'id': session_id, 'session_date': start + step * session_id, 'total_questions': 20,
+                                     'winner': winner, 'quiz_type': "standard"})
+                participant_rows.extend(
+                    {'session_id': session_id, 'position': position, 'player_name': player, 'score': score,
+                     'is_winner': player == winner}
+                    for position, (player, score) in enumerate(scores.items()))
+                category_rows.extend(
+                    {'session_id': session_id, 'player_name': player, 'category': rng.choice(CATEGORIES),
+                     'questions': 20, 'correct': score}
+                    for player, score in scores.items())
+            conn.execute(database.QuizSession.__table__.insert(), session_rows)
+            conn.execute(database.SessionParticipant.__table__.insert(), participant_rows)
+            conn.execute(database.SessionCategoryResult.__table__.insert(), category_rows)
+    database.rebuild_rollups()
+
+
+LETTERS = "abcdefghijklmnopqrstuvwxyzéèàç"
+
+
+def make_sentences(n, seed=0, duplicate_rate=0.01, vocabulary=20_000):
+    """Random question texts plus ``(original, copy)`` pairs of lightly edited near-duplicates."""
+    rng = random.Random(seed)
+    words = [''.join(rng.choice(LETTERS) for _ in range(rng.randint(2, 9))) for _ in range(vocabulary)]
+    texts, pairs = [], []
+    for i in range(n):
+        if texts and rng.random() < duplicate_rate:
+            original = rng.randrange(len(texts))
+            edited = texts[original].split()
+            edit = rng.randrange(3)
+            position = rng.randrange(len(edited))
+            if edit == 0:
+                word = edited[position]
+                k = rng.randrange(len(word))
+                edited[position] = word[:k] + rng.choice("aeiou") + word[k + 1:]
+            elif edit == 1 and len(edited) > 6:
+                del edited[position]
+            else:
+                edited[position] = edited[position].upper()
+            texts.append(' '.join(edited))
+            pairs.append((original, i))
+        else:
+            texts.append(' '.join(rng.choice(words) for _ in range(rng.randint(8, 16))) + ' ?')
+    return texts, pairs
@@ -1,38 +1,99 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float
+from sqlalchemy import create_engine, Boolean, Column, Date, ForeignKey, Integer, String, DateTime, Index, and_, case, column, func, inspect, insert, literal, select, table, tuple_, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, sessionmaker
+from collections import OrderedDict, namedtuple
+import argparse
+from datetime import date, datetime
+from itertools import combinations
 import os
+import threading
+import time
+from types import MappingProxyType
+
+from metrics import instrument_engine, registry, timed
 
 DATABASE_URL = os.getenv('DATABASE_URL')
+DATABASE_AVAILABLE = bool(DATABASE_URL)
 Base = declarative_base()
 
-if DATABASE_URL:
-    try:
-        engine = create_engine(DATABASE_URL)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        DATABASE_AVAILABLE = True
-    except Exception as e:
-        print(f"Warning: Database connection failed: {e}")
-        DATABASE_AVAILABLE = False
-        engine = None
-        SessionLocal = None
-else:
+_engine = None
+_session_factory = None
+_schema_ready = False
+_init_lock = threading.Lock()
+
+if not DATABASE_URL:
     print("Warning: DATABASE_URL not set, database features disabled")
-    DATABASE_AVAILABLE = False
-    engine = None
-    SessionLocal = None
+
+def engine_options(url):
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    }
+    if make_url(url).get_backend_name() != 'sqlite':
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', '5'))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    return options
+
+def get_engine():
+    """Create the engine on first use, once per process."""
+    global _engine, _session_factory, DATABASE_AVAILABLE
+    if _engine is None and DATABASE_AVAILABLE:
+        with _init_lock:
+            if _engine is None and DATABASE_AVAILABLE:
+                try:
+                    engine = instrument_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+                    _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                    _engine = engine
+                except Exception as e:
+                    print(f"Warning: Database connection failed: {e}")
+                    DATABASE_AVAILABLE = False
+    return _engine
+
+def database_available():
+    return get_engine() is not None
+
+def SessionLocal():
+    get_engine()
+    return _session_factory()
+
+def __getattr__(name):
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _ratio(numerator, denominator):
+    return case((denominator > 0, numerator * 1.0 / denominator), else_=0.0)
 
 class QuizSession(Base):
     __tablename__ = "quiz_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
     session_date = Column(DateTime, default=datetime.utcnow)
-    nafi_score = Column(Integer)
-    moya_score = Column(Integer)
     total_questions = Column(Integer)
     winner = Column(String)
     quiz_type = Column(String, default="standard")
+    
+    participants = relationship('SessionParticipant', order_by='SessionParticipant.position', lazy='selectin')
+    
+    __table_args__ = (
+        Index('ix_quiz_sessions_session_date_id', 'session_date', 'id'),
+    )
+
+class SessionParticipant(Base):
+    __tablename__ = "session_participants"
+    
+    session_id = Column(Integer, ForeignKey('quiz_sessions.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    player_name = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    is_winner = Column(Boolean, nullable=False, default=False)
+    
+    __table_args__ = (
+        Index('ix_session_participants_player_session', 'player_name', 'session_id', 'score', 'is_winner'),
+    )
 
 class PlayerStats(Base):
     __tablename__ = "player_stats"
@@ -42,11 +103,181 @@ class PlayerStats(Base):
     total_games = Column(Integer, default=0)
     total_wins = Column(Integer, default=0)
     total_score = Column(Integer, default=0)
-    average_score = Column(Float, default=0.0)
+    
+    @hybrid_property
+    def average_score(self):
+        return self.total_score / self.total_games if self.total_games else 0.0
+    
+    @average_score.expression
+    def average_score(cls):
+        return _ratio(cls.total_score, cls.total_games)
+    
+    @hybrid_property
+    def win_rate(self):
+        return self.total_wins / self.total_games if self.total_games else 0.0
+    
+    @win_rate.expression
+    def win_rate(cls):
+        return _ratio(cls.total_wins, cls.total_games)
+
+class SessionCategoryResult(Base):
+    __tablename__ = "session_category_results"
+    
+    session_id = Column(Integer, ForeignKey('quiz_sessions.id', ondelete='CASCADE'), primary_key=True)
+    player_name = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    questions = Column(Integer, nullable=False)
+    correct = Column(Integer, nullable=False)
+
+class PlayerDailyStats(Base):
+    __tablename__ = "player_daily_stats"
+    
+    player_name = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    games = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    total_score = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('ix_player_daily_stats_day', 'day'),
+    )
+
+class PlayerCategoryStats(Base):
+    __tablename__ = "player_category_stats"
+    
+    player_name = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    questions = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+
+class HeadToHead(Base):
+    __tablename__ = "head_to_head"
+    
+    player_a = Column(String, primary_key=True)
+    player_b = Column(String, primary_key=True)
+    games = Column(Integer, nullable=False, default=0)
+    wins_a = Column(Integer, nullable=False, default=0)
+    wins_b = Column(Integer, nullable=False, default=0)
+
+ROLLUPS = (
+    (PlayerStats, ('player_name',)),
+    (PlayerDailyStats, ('player_name', 'day')),
+    (PlayerCategoryStats, ('player_name', 'category')),
+    (HeadToHead, ('player_a', 'player_b')),
+)
+
+class AnswerEvent(Base):
+    __tablename__ = "answer_events"
+    
+    id = Column(Integer, primary_key=True)
+    answered_at = Column(DateTime, default=datetime.utcnow)
+    question_id = Column(Integer, index=True)
+    player_name = Column(String)
+    choice = Column(String, nullable=True)
+    is_correct = Column(Boolean)
+    latency_ms = Column(Integer, nullable=True)
+
+HISTORY_PAGE_SIZE = 20
+LEADERBOARD_SIZE = 20
+TIE = "Égalité"
+LEGACY_PLAYERS = ("Nafi", "Moya")
+ROLLUP_BATCH_SIZE = int(os.getenv('ROLLUP_BATCH_SIZE', '50000'))
+
+PlayerRecord = namedtuple('PlayerRecord', 'player_name total_games total_wins total_score average_score win_rate')
+SessionRecord = namedtuple('SessionRecord', 'id session_date total_questions winner scores')
+DailyRecord = namedtuple('DailyRecord', 'day games wins total_score win_rate')
+CategoryRecord = namedtuple('CategoryRecord', 'category questions correct accuracy')
+HeadToHeadRecord = namedtuple('HeadToHeadRecord', 'player games wins opponent_wins ties')
+
+class TTLCache:
+    """Thread-safe read-through cache with a TTL, an LRU size bound and hit/miss/eviction counters."""
+    
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+    
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'ttl': self.ttl, 'maxsize': self.maxsize}
+
+query_cache = TTLCache(
+    ttl=float(os.getenv('DB_CACHE_TTL', '30')),
+    maxsize=int(os.getenv('DB_CACHE_SIZE', '256')),
+)
+
+def cache_stats():
+    return query_cache.stats()
+
+registry.add_collector('quiz_query_cache', cache_stats)
 
 def init_db():
-    if DATABASE_AVAILABLE:
-        Base.metadata.create_all(bind=engine)
+    """Create missing tables and indexes; runs once per process however often it is called."""
+    global _schema_ready
+    if _schema_ready or not database_available():
+        return
+    with _init_lock:
+        if not _schema_ready:
+            existing = set(inspect(_engine).get_table_names())
+            Base.metadata.create_all(bind=_engine)
+            for index in QuizSession.__table__.indexes:
+                index.create(bind=_engine, checkfirst=True)
+            migrate_legacy_scores()
+            if any(model.__tablename__ not in existing for model, _ in ROLLUPS):
+                rebuild_rollups()
+            _schema_ready = True
+
+def migrate_legacy_scores():
+    """Move scores from the old fixed nafi_score/moya_score columns into session_participants."""
+    columns = {c['name'] for c in inspect(_engine).get_columns(QuizSession.__tablename__)}
+    legacy = [f"{name.lower()}_score" for name in LEGACY_PLAYERS]
+    if not set(legacy) <= columns:
+        return
+    
+    sessions = table(QuizSession.__tablename__, column('id'), column('winner'), *map(column, legacy))
+    participants = SessionParticipant.__table__
+    pending = sessions.c[legacy[0]].isnot(None)
+    with _engine.begin() as conn:
+        for position, (name, score) in enumerate(zip(LEGACY_PLAYERS, legacy)):
+            rows = select(
+                sessions.c.id, literal(position), literal(name), func.coalesce(sessions.c[score], 0),
+                sessions.c.winner == name,
+            ).where(pending)
+            conn.execute(participants.insert().from_select(
+                ['session_id', 'position', 'player_name', 'score', 'is_winner'], rows))
+        conn.execute(sessions.update().where(pending).values(dict.fromkeys(legacy)))
 
 def get_db():
     db = SessionLocal()
@@ -55,63 +286,198 @@ def get_db():
     finally:
         pass
 
-def save_session(nafi_score, moya_score, total_questions, quiz_type="standard"):
-    if not DATABASE_AVAILABLE:
+def session_winner(scores):
+    best = max(scores.values(), default=0)
+    leaders = [player for player, score in scores.items() if score == best]
+    return leaders[0] if len(leaders) == 1 else TIE
+
+@timed('db.save_session')
+def save_session(scores, total_questions, quiz_type="standard", answers=()):
+    """Store a finished game and fold it into the rollups, in one transaction.
+
+    ``scores`` maps player names to points in seat order; ``answers`` yields
+    ``(player, category, is_correct)`` for every question asked.
+    """
+    if not database_available():
         return
     
-    db = SessionLocal()
-    try:
-        if nafi_score > moya_score:
-            winner = "Nafi"
-        elif moya_score > nafi_score:
-            winner = "Moya"
-        else:
-            winner = "Égalité"
-        
-        session = QuizSession(
-            nafi_score=nafi_score,
-            moya_score=moya_score,
+    now = datetime.utcnow()
+    winner = session_winner(scores)
+    tally = {}
+    for player, category, is_correct in answers:
+        counts = tally.setdefault((player, category), [0, 0])
+        counts[0] += 1
+        counts[1] += bool(is_correct)
+    
+    with SessionLocal() as db, db.begin():
+        session_id = db.execute(insert(QuizSession).values(
+            session_date=now,
             total_questions=total_questions,
             winner=winner,
             quiz_type=quiz_type
-        )
-        db.add(session)
-        db.commit()
-        
-        update_player_stats(db, "Nafi", nafi_score, winner == "Nafi")
-        update_player_stats(db, "Moya", moya_score, winner == "Moya")
+        )).inserted_primary_key[0]
+        db.execute(insert(SessionParticipant), [
+            {'session_id': session_id, 'position': position, 'player_name': player,
+             'score': score, 'is_winner': player == winner}
+            for position, (player, score) in enumerate(scores.items())
+        ])
+        categories = [
+            {'session_id': session_id, 'player_name': player, 'category': category, 'questions': questions, 'correct': correct}
+            for (player, category), (questions, correct) in sorted(tally.items())
+        ]
+        if categories:
+            db.execute(insert(SessionCategoryResult), categories)
         
-    finally:
-        db.close()
+        players = sorted(scores)
+        _accumulate(db, PlayerStats, ('player_name',), [
+            {'player_name': p, 'total_games': 1, 'total_wins': int(p == winner), 'total_score': scores[p]} for p in players
+        ])
+        _accumulate(db, PlayerDailyStats, ('player_name', 'day'), [
+            {'player_name': p, 'day': now.date(), 'games': 1, 'wins': int(p == winner), 'total_score': scores[p]}
+            for p in players
+        ])
+        _accumulate(db, PlayerCategoryStats, ('player_name', 'category'), [
+            {'player_name': row['player_name'], 'category': row['category'], 'questions': row['questions'], 'correct': row['correct']}
+            for row in categories
+        ])
+        _accumulate(db, HeadToHead, ('player_a', 'player_b'), [
+            {'player_a': a, 'player_b': b, 'games': 1, 'wins_a': int(scores[a] > scores[b]), 'wins_b': int(scores[b] > scores[a])}
+            for a, b in combinations(players, 2)
+        ])
+    query_cache.invalidate()
+
+def _dialect_insert(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
 
 def update_player_stats(db, player_name, score, is_winner):
-    stats = db.query(PlayerStats).filter(PlayerStats.player_name == player_name).first()
+    _accumulate(db, PlayerStats, ('player_name',), [
+        {'player_name': player_name, 'total_games': 1, 'total_wins': int(is_winner), 'total_score': score}
+    ])
+
+def _accumulate(db, model, keys, rows):
+    """Insert rollup rows, adding their counters onto any existing row with the same key."""
+    if not rows:
+        return
+    table = model.__table__
+    counters = [name for name in rows[0] if name not in keys]
+    dialect_insert = _dialect_insert(db.get_bind().dialect.name)
     
-    if not stats:
-        stats = PlayerStats(player_name=player_name)
-        db.add(stats)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+        ), rows)
+        return
     
-    stats.total_games += 1
-    stats.total_score += score
-    if is_winner:
-        stats.total_wins += 1
-    stats.average_score = stats.total_score / stats.total_games
+    for row in rows:
+        increment = update(table).where(*(table.c[key] == row[key] for key in keys)) \
+            .values({name: table.c[name] + row[name] for name in counters})
+        if db.execute(increment).rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(table).values(row))
+            except IntegrityError:
+                db.execute(increment)
+
+def _rollup_queries(low, high):
+    """Grouped queries recomputing every rollup from the raw rows of sessions ``low < id <= high``."""
+    p = SessionParticipant.__table__.c
+    s = QuizSession.__table__.c
+    r = SessionCategoryResult.__table__.c
+    in_range = lambda column: column.between(low + 1, high)
+    wins = func.sum(case((p.is_winner, 1), else_=0))
+    day = func.date(s.session_date)
+    other = SessionParticipant.__table__.alias('other')
+    
+    yield PlayerStats, select(
+        p.player_name, func.count().label('total_games'), wins.label('total_wins'), func.sum(p.score).label('total_score'),
+    ).where(in_range(p.session_id)).group_by(p.player_name)
+    yield PlayerDailyStats, select(
+        p.player_name, day.label('day'), func.count().label('games'), wins.label('wins'), func.sum(p.score).label('total_score'),
+    ).join_from(SessionParticipant.__table__, QuizSession.__table__, p.session_id == s.id) \
+        .where(in_range(s.id)).group_by(p.player_name, day)
+    yield PlayerCategoryStats, select(
+        r.player_name, r.category, func.sum(r.questions).label('questions'), func.sum(r.correct).label('correct'),
+    ).where(in_range(r.session_id)).group_by(r.player_name, r.category)
+    yield HeadToHead, select(
+        p.player_name.label('player_a'), other.c.player_name.label('player_b'), func.count().label('games'),
+        func.sum(case((p.score > other.c.score, 1), else_=0)).label('wins_a'),
+        func.sum(case((other.c.score > p.score, 1), else_=0)).label('wins_b'),
+    ).join(other, and_(other.c.session_id == p.session_id, other.c.player_name > p.player_name)) \
+        .where(in_range(p.session_id)).group_by(p.player_name, other.c.player_name)
+
+@timed('db.rebuild_rollups')
+def rebuild_rollups(batch_size=ROLLUP_BATCH_SIZE, progress=None):
+    """Recompute every rollup from the raw session tables, ``batch_size`` sessions per transaction.
+
+    Rollups are cleared first and sessions saved while the rebuild runs land
+    above the captured high-water mark, so save_session keeps counting them.
+    """
+    if not database_available():
+        return 0
+    
+    with SessionLocal() as db, db.begin():
+        for model, _ in ROLLUPS:
+            db.execute(model.__table__.delete())
+        last_id = db.execute(select(func.max(QuizSession.id))).scalar() or 0
     
-    db.commit()
+    dialect_insert = _dialect_insert(get_engine().dialect.name)
+    for low in range(0, last_id, batch_size):
+        high = min(low + batch_size, last_id)
+        with SessionLocal() as db, db.begin():
+            for model, query in _rollup_queries(low, high):
+                keys = dict(ROLLUPS)[model]
+                if dialect_insert is not None:
+                    table = model.__table__
+                    stmt = dialect_insert(table).from_select([c.name for c in query.selected_columns], query)
+                    db.execute(stmt.on_conflict_do_update(
+                        index_elements=list(keys),
+                        set_={c.name: table.c[c.name] + stmt.excluded[c.name] for c in query.selected_columns
+                              if c.name not in keys},
+                    ))
+                    continue
+                rows = [row._asdict() for row in db.execute(query)]
+                if model is PlayerDailyStats:
+                    for row in rows:
+                        if isinstance(row['day'], str):
+                            row['day'] = date.fromisoformat(row['day'])
+                _accumulate(db, model, keys, rows)
+        if progress is not None:
+            progress(high, last_id)
+    query_cache.invalidate()
+    return last_id
+
+_player_columns = (
+    PlayerStats.player_name,
+    PlayerStats.total_games,
+    PlayerStats.total_wins,
+    PlayerStats.total_score,
+    PlayerStats.average_score,
+    PlayerStats.win_rate,
+)
 
+@timed('db.get_player_stats')
 def get_player_stats(player_name):
-    if not DATABASE_AVAILABLE:
+    if not database_available():
         return None
     
-    db = SessionLocal()
-    try:
-        stats = db.query(PlayerStats).filter(PlayerStats.player_name == player_name).first()
-        return stats
-    finally:
-        db.close()
+    def load():
+        with SessionLocal() as db:
+            row = db.execute(select(*_player_columns).where(PlayerStats.player_name == player_name)).first()
+            return PlayerRecord(*row) if row else None
+    
+    return query_cache.get_or_load(('player', player_name), load)
 
+@timed('db.get_all_sessions')
 def get_all_sessions():
-    if not DATABASE_AVAILABLE:
+    if not database_available():
         return []
     
     db = SessionLocal()
@@ -121,13 +487,151 @@ def get_all_sessions():
     finally:
         db.close()
 
-def get_leaderboard():
-    if not DATABASE_AVAILABLE:
+@timed('db.get_sessions_page')
+def get_sessions_page(before=None, limit=HISTORY_PAGE_SIZE):
+    """Return up to ``limit`` sessions older than the ``(session_date, id)`` cursor, newest first."""
+    if not database_available():
+        return ()
+    
+    query = select(
+        QuizSession.id,
+        QuizSession.session_date,
+        QuizSession.total_questions,
+        QuizSession.winner,
+    )
+    if before is not None:
+        query = query.where(tuple_(QuizSession.session_date, QuizSession.id) < tuple(before))
+    query = query.order_by(QuizSession.session_date.desc(), QuizSession.id.desc()).limit(limit)
+    
+    def load():
+        with SessionLocal() as db:
+            sessions = db.execute(query).all()
+            scores = {row.id: {} for row in sessions}
+            if scores:
+                participants = select(
+                    SessionParticipant.session_id, SessionParticipant.player_name, SessionParticipant.score,
+                ).where(SessionParticipant.session_id.in_(scores)).order_by(
+                    SessionParticipant.session_id, SessionParticipant.position)
+                for session_id, player, score in db.execute(participants):
+                    scores[session_id][player] = score
+            return tuple(SessionRecord(*row, MappingProxyType(scores[row.id])) for row in sessions)
+    
+    return query_cache.get_or_load(('sessions', before, limit), load)
+
+@timed('db.count_sessions')
+def count_sessions():
+    if not database_available():
+        return 0
+    
+    def load():
+        with SessionLocal() as db:
+            return db.execute(select(func.count()).select_from(QuizSession)).scalar_one()
+    
+    return query_cache.get_or_load(('count_sessions',), load)
+
+@timed('db.get_question_accuracy')
+def get_question_accuracy():
+    """Return ``(question_id, answers, correct)`` for every question with recorded answers."""
+    if not database_available():
         return []
     
-    db = SessionLocal()
-    try:
-        stats = db.query(PlayerStats).all()
-        return stats
-    finally:
-        db.close()
+    correct = func.sum(case((AnswerEvent.is_correct, 1), else_=0))
+    query = select(AnswerEvent.question_id, func.count(), correct).group_by(AnswerEvent.question_id)
+    with SessionLocal() as db:
+        return db.execute(query).all()
+
+@timed('db.get_player_accuracy')
+def get_player_accuracy():
+    if not database_available():
+        return []
+    
+    correct = func.sum(case((AnswerEvent.is_correct, 1), else_=0))
+    query = select(AnswerEvent.player_name, func.count(), correct).group_by(AnswerEvent.player_name)
+    with SessionLocal() as db:
+        return db.execute(query).all()
+
+@timed('db.get_leaderboard')
+def get_leaderboard(players=None, limit=LEADERBOARD_SIZE):
+    """Rank players by wins then average score, read from the player_stats rollup."""
+    if not database_available():
+        return ()
+    
+    query = select(*_player_columns)
+    if players is not None:
+        players = tuple(players)
+        query = query.where(PlayerStats.player_name.in_(players))
+    query = query.order_by(PlayerStats.total_wins.desc(), PlayerStats.average_score.desc(), PlayerStats.player_name)
+    query = query.limit(limit)
+    
+    def load():
+        with SessionLocal() as db:
+            return tuple(PlayerRecord(*row) for row in db.execute(query))
+    
+    return query_cache.get_or_load(('leaderboard', players, limit), load)
+
+@timed('db.get_player_trend')
+def get_player_trend(player_name, since=None):
+    """Per-day games, wins and win rate for one player, oldest first."""
+    if not database_available():
+        return ()
+    
+    daily = PlayerDailyStats
+    query = select(daily.day, daily.games, daily.wins, daily.total_score, _ratio(daily.wins, daily.games)) \
+        .where(daily.player_name == player_name).order_by(daily.day)
+    if since is not None:
+        query = query.where(daily.day >= since)
+    
+    def load():
+        with SessionLocal() as db:
+            return tuple(DailyRecord(*row) for row in db.execute(query))
+    
+    return query_cache.get_or_load(('trend', player_name, since), load)
+
+@timed('db.get_category_accuracy')
+def get_category_accuracy(player_name):
+    if not database_available():
+        return ()
+    
+    stats = PlayerCategoryStats
+    query = select(stats.category, stats.questions, stats.correct, _ratio(stats.correct, stats.questions)) \
+        .where(stats.player_name == player_name).order_by(stats.category)
+    
+    def load():
+        with SessionLocal() as db:
+            return tuple(CategoryRecord(*row) for row in db.execute(query))
+    
+    return query_cache.get_or_load(('categories', player_name), load)
+
+@timed('db.get_head_to_head')
+def get_head_to_head(player, opponent):
+    """Games, wins and ties between two players, from ``player``'s point of view."""
+    if not database_available():
+        return None
+    
+    a, b = sorted((player, opponent))
+    query = select(HeadToHead.games, HeadToHead.wins_a, HeadToHead.wins_b) \
+        .where(HeadToHead.player_a == a, HeadToHead.player_b == b)
+    
+    def load():
+        with SessionLocal() as db:
+            row = db.execute(query).first()
+        if row is None:
+            return HeadToHeadRecord(player, 0, 0, 0, 0)
+        games, wins_a, wins_b = row
+        wins, opponent_wins = (wins_a, wins_b) if player == a else (wins_b, wins_a)
+        return HeadToHeadRecord(player, games, wins, opponent_wins, games - wins - opponent_wins)
+    
+    return query_cache.get_or_load(('head_to_head', player, opponent), load)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance de la base de quiz")
+    parser.add_argument('command', choices=['rebuild-rollups'])
+    parser.add_argument('--batch-size', type=int, default=ROLLUP_BATCH_SIZE)
+    args = parser.parse_args()
+    
+    init_db()
+    total = rebuild_rollups(args.batch_size, progress=lambda done, total: print(f"{done}/{total} parties"))
+    print(f"Agrégats reconstruits à partir de {total} parties")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, String, select, tuple_
+
+from database import PlayerStats, QuizSession, SessionParticipant, database_available, get_engine, init_db
+from metrics import timed
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '50000'))
+FORMATS = ('csv', 'parquet')
+
+
+def sessions_query(since=None):
+    query = select(QuizSession.id, QuizSession.session_date, QuizSession.total_questions, QuizSession.winner,
+                   QuizSession.quiz_type)
+    if since is not None:
+        query = query.where(tuple_(QuizSession.session_date, QuizSession.id) > tuple(since))
+    return query.order_by(QuizSession.session_date, QuizSession.id)
+
+
+def participants_query(since=None):
+    query = select(
+        SessionParticipant.session_id, QuizSession.session_date, SessionParticipant.position,
+        SessionParticipant.player_name, SessionParticipant.score, SessionParticipant.is_winner,
+    ).join(QuizSession, QuizSession.id == SessionParticipant.session_id)
+    if since is not None:
+        query = query.where(tuple_(QuizSession.session_date, QuizSession.id) > tuple(since))
+    return query.order_by(QuizSession.session_date, QuizSession.id, SessionParticipant.position)
+
+
+def player_stats_query(since=None):
+    return select(
+        PlayerStats.player_name, PlayerStats.total_games, PlayerStats.total_wins, PlayerStats.total_score,
+        PlayerStats.average_score.label('average_score'), PlayerStats.win_rate.label('win_rate'),
+    ).order_by(PlayerStats.player_name)
+
+
+def _session_cursor(row):
+    return row[1], row[0]
+
+
+# name -> (query builder, ``(session_date, session_id)`` cursor of a row or None for full snapshots)
+DATASETS = {
+    'sessions': (sessions_query, _session_cursor),
+    'participants': (participants_query, _session_cursor),
+    'player_stats': (player_stats_query, None),
+}
+
+
+class CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column.name for column in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+def _arrow_type(pa, sql_type):
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(sql_type, String):
+        return pa.string()
+    return pa.float64()
+
+
+class ParquetWriter:
+    """One Parquet row group per batch, so only the current batch is ever held as Arrow arrays."""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("L'export Parquet nécessite pyarrow (pip install pyarrow)") from None
+        self.pa = pa
+        self.schema = pa.schema([(column.name, _arrow_type(pa, column.type)) for column in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, rows):
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+def export_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu {fmt!r} : choisir parmi {', '.join(FORMATS)}")
+    return fmt
+
+
+@timed('export.dataset')
+def export_dataset(dataset, path, fmt=None, since=None, batch_size=EXPORT_BATCH_SIZE):
+    """Stream ``dataset`` into ``path`` in batches of ``batch_size`` rows.
+
+    Rows come from a server-side cursor (``stream_results`` + ``yield_per``) and
+    each batch is written before the next is fetched, so memory does not grow
+    with the table. ``since`` is a ``(session_date, session_id)`` watermark:
+    only later sessions are exported. Returns ``(rows, watermark)``, the
+    watermark being the cursor of the last exported session (``since`` when
+    nothing is newer, None for snapshots). The file is replaced atomically.
+    """
+    build, cursor = DATASETS[dataset]
+    writer_class = WRITERS[export_format(path, fmt)]
+    query = build(since if cursor is not None else None)
+    watermark = since if cursor is not None else None
+    rows = 0
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = writer_class(tmp, query.selected_columns)
+    try:
+        with get_engine().connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for batch in result.partitions():
+                writer.write(batch)
+                rows += len(batch)
+                if cursor is not None:
+                    watermark = cursor(batch[-1])
+        writer.close()
+        os.replace(tmp, path)
+    except BaseException:
+        writer.close()
+        os.remove(tmp)
+        raise
+    return rows, watermark
+
+
+def load_watermark(path, dataset):
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f).get(dataset)
+    except FileNotFoundError:
+        return None
+    return None if state is None else (datetime.fromisoformat(state['session_date']), state['session_id'])
+
+
+def save_watermark(path, dataset, watermark):
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    state[dataset] = {'session_date': watermark[0].isoformat(), 'session_id': watermark[1]}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export par lots de l'historique des parties et des statistiques joueurs")
+    parser.add_argument('dataset', choices=list(DATASETS))
+    parser.add_argument('-o', '--output', required=True, help="fichier .csv ou .parquet")
+    parser.add_argument('--format', choices=FORMATS, help="par défaut, d'après l'extension du fichier")
+    parser.add_argument('--since', type=datetime.fromisoformat,
+                        help="n'exporter que les parties jouées à partir de cette date (ISO 8601)")
+    parser.add_argument('--watermark', help="fichier JSON du dernier export : reprend après et est mis à jour")
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if not database_available():
+        parser.error("DATABASE_URL n'est pas configurée")
+    init_db()
+    incremental = DATASETS[args.dataset][1] is not None
+    if not incremental and (args.since or args.watermark):
+        parser.error(f"{args.dataset} est un instantané complet : --since et --watermark ne s'appliquent pas")
+    since = load_watermark(args.watermark, args.dataset) if args.watermark else None
+    if since is None and args.since is not None:
+        since = (args.since, 0)
+
+    rows, watermark = export_dataset(args.dataset, args.output, args.format, since, args.batch_size)
+    print(f"{rows} lignes exportées vers {args.output}")
+    if watermark is not None:
+        print(f"Dernière partie exportée : {watermark[0].isoformat()} (n°{watermark[1]})")
+        if args.watermark:
+            save_watermark(args.watermark, args.dataset, watermark)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+from array import array
+from collections import namedtuple
+
+from quiz_bank import ALL
+
+PLAYERS = ("Nafi", "Moya")
+TIE = "Égalité"
+
+AnswerResult = namedtuple('AnswerResult', 'question_id player choice is_correct latency')
+
+
+class GameSession:
+    """Headless quiz game: question order, answers, scoring, timer deadline and winner.
+
+    Holds no Streamlit state and never reads the clock itself; callers pass ``now``
+    so the same engine drives the UI, the simulator and tests.
+    """
+    __slots__ = (
+        'players', 'bank_digest', 'question_ids', 'current_question',
+        'scores', 'choices', 'answered_at', 'answered', 'saved', 'results',
+        'question_shown_at', 'question_start_time',
+        'category', 'difficulty', 'timer_enabled', 'timer_duration',
+    )
+
+    def __init__(self, question_ids=(), bank_digest=None, players=PLAYERS):
+        self.players = tuple(players)
+        self.bank_digest = bank_digest
+        self.category = ALL
+        self.difficulty = ALL
+        self.timer_enabled = False
+        self.timer_duration = 30
+        self.restart(question_ids)
+
+    def restart(self, question_ids, bank_digest=None):
+        if bank_digest is not None:
+            self.bank_digest = bank_digest
+        self.question_ids = array('I', question_ids)
+        self.current_question = 0
+        self.scores = dict.fromkeys(self.players, 0)
+        self.results = []
+        self.saved = False
+        self.question_start_time = None
+        self.clear_answers()
+
+    def clear_answers(self):
+        self.answered = False
+        self.choices = dict.fromkeys(self.players)
+        self.answered_at = dict.fromkeys(self.players)
+        self.question_shown_at = None
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    @property
+    def current_id(self):
+        return self.question_ids[self.current_question]
+
+    @property
+    def finished(self):
+        return self.current_question >= len(self.question_ids)
+
+    @property
+    def is_last_question(self):
+        return self.current_question >= len(self.question_ids) - 1
+
+    def show_question(self, now):
+        if self.question_shown_at is None:
+            self.question_shown_at = now
+        if self.timer_enabled and not self.answered and self.question_start_time is None:
+            self.question_start_time = now
+
+    @property
+    def deadline(self):
+        if not self.timer_enabled or self.question_start_time is None:
+            return None
+        return self.question_start_time + self.timer_duration
+
+    def remaining(self, now):
+        deadline = self.deadline
+        return None if deadline is None else max(0.0, deadline - now)
+
+    def is_expired(self, now):
+        remaining = self.remaining(now)
+        return remaining is not None and remaining <= 0 and not self.answered
+
+    def choose(self, player, option, now):
+        """Record a player's option; refused once the question is scored or its deadline has passed."""
+        if self.answered or player not in self.choices or self.is_expired(now):
+            return False
+        self.choices[player] = option
+        self.answered_at[player] = now
+        return True
+
+    @property
+    def waiting_for(self):
+        return [player for player in self.players if self.choices[player] is None]
+
+    def validate(self, correct_answer):
+        """Score the current question once and return one AnswerResult per player."""
+        if self.answered:
+            return []
+        self.answered = True
+        results = []
+        for player in self.players:
+            choice = self.choices[player]
+            is_correct = choice is not None and choice == correct_answer
+            if is_correct:
+                self.scores[player] += 1
+            answered_at = self.answered_at[player]
+            latency = None
+            if choice is not None and answered_at is not None and self.question_shown_at is not None:
+                latency = answered_at - self.question_shown_at
+            results.append(AnswerResult(self.current_id, player, choice, is_correct, latency))
+        self.results.extend(results)
+        return results
+
+    def next_question(self, now=None):
+        self.current_question += 1
+        self.clear_answers()
+        self.question_start_time = now if self.timer_enabled and not self.finished else None
+
+    def category_answers(self, bank):
+        """``(player, category, is_correct)`` for every scored answer, as save_session expects."""
+        question_ids = {r.question_id for r in self.results}
+        categories = {question_id: bank.get(question_id).get('category', ALL) for question_id in question_ids}
+        return [(r.player, categories[r.question_id], r.is_correct) for r in self.results]
+
+    def winner(self):
+        best = max(self.scores.values(), default=0)
+        leaders = [player for player, score in self.scores.items() if score == best]
+        return leaders[0] if len(leaders) == 1 else TIE
@@ -0,0 +1,227 @@
+import functools
+import io
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+WINDOW = int(os.getenv('METRICS_WINDOW', '1024'))
+METRICS_FILE = os.getenv('METRICS_FILE', 'metrics.prom')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+PROFILE_LINES = 40
+QUANTILES = (0.5, 0.9, 0.99)
+
+SpanStats = namedtuple('SpanStats', 'name count total p50 p90 p99 max')
+
+
+def quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Series:
+    """Call count and total time since start, plus the last ``window`` durations for percentiles."""
+    __slots__ = ('count', 'total', 'recent')
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+
+class Registry:
+    """Thread-safe timing series keyed by span name, and gauge collectors for the Prometheus export."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._series = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = Series(self.window)
+            series.count += 1
+            series.total += seconds
+            series.recent.append(seconds)
+
+    def add_collector(self, prefix, collect):
+        """``collect()`` returns a dict of numeric gauges (or None), exported as ``{prefix}_{key}``."""
+        self._collectors[prefix] = collect
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        with self._lock:
+            series = [(name, s.count, s.total, sorted(s.recent)) for name, s in self._series.items()]
+        return [
+            SpanStats(name, count, total, *(quantile(recent, q) for q in QUANTILES), recent[-1] if recent else 0.0)
+            for name, count, total, recent in sorted(series)
+        ]
+
+    def gauges(self):
+        values = {}
+        for prefix, collect in list(self._collectors.items()):
+            try:
+                stats = collect()
+            except Exception:
+                continue
+            for key, value in (stats or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[f"{prefix}_{key}"] = value
+        return values
+
+    def prometheus(self):
+        lines = [
+            "# HELP quiz_span_seconds Durée des opérations instrumentées (quantiles sur les derniers appels).",
+            "# TYPE quiz_span_seconds summary",
+        ]
+        for stats in self.snapshot():
+            label = _label(stats.name)
+            for q, value in zip(QUANTILES, (stats.p50, stats.p90, stats.p99)):
+                lines.append(f'quiz_span_seconds{{span="{label}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'quiz_span_seconds_sum{{span="{label}"}} {stats.total:.6f}')
+            lines.append(f'quiz_span_seconds_count{{span="{label}"}} {stats.count}')
+        for name, value in sorted(self.gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+def observe(name, seconds):
+    if ENABLED:
+        registry.observe(name, seconds)
+
+
+@contextmanager
+def span(name):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator recording each call's duration under ``name``."""
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _statement_kind(statement):
+    words = statement.split(None, 1)
+    return words[0].lower() if words else 'unknown'
+
+
+def instrument_engine(engine):
+    """Time every statement run through ``engine`` as ``sql.<verb>`` (select, insert, ...)."""
+    if not ENABLED or getattr(engine, '_metrics_instrumented', False):
+        return engine
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_started')
+        if started:
+            registry.observe(f"sql.{_statement_kind(statement)}", time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, 'handle_error')
+    def failed(context):
+        started = context.connection.info.get('query_started') if context.connection is not None else None
+        if started:
+            started.pop()
+            registry.observe('sql.error', 0.0)
+
+    engine._metrics_instrumented = True
+    return engine
+
+
+def start_profile():
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def finish_profile(profiler, limit=PROFILE_LINES):
+    """Stop ``profiler`` and return its top functions by cumulative time as text."""
+    import pstats
+
+    profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+def write_prometheus(path=METRICS_FILE):
+    """Write the Prometheus text exposition atomically, e.g. for node_exporter's textfile collector."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(registry.prometheus())
+    os.replace(tmp, path)
+    return path
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port, host='127.0.0.1'):
+    """Expose ``/metrics`` from a background thread, once per process."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
@@ -0,0 +1,386 @@
+import argparse
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import random
+import sys
+import tempfile
+import threading
+from array import array
+from types import MappingProxyType
+
+from metrics import span, timed
+
+QUIZZES_PATH = 'quizzes.json'
+ALL = "Toutes"
+DIFFICULTIES = ["Facile", "Moyen", "Difficile"]
+
+INDEX_FORMAT = 2
+NO_CODE = {'H': 0xFFFF, 'B': 0xFF}
+READ_CHUNK = 1 << 16
+MAX_ITEM_SIZE = 1 << 20
+
+_lock = threading.Lock()
+_banks = {}
+
+
+class QuizBank:
+    """Questions addressed by position; ``id`` fields give each one a stable id across bank versions.
+
+    A bank without ids numbers its questions by position.
+    """
+    __slots__ = ('questions', 'digest', 'version', 'index', 'categories', 'counts', '_stable_ids', '_positions')
+
+    def __init__(self, questions, digest, version=0):
+        self.questions = tuple(_freeze(q) for q in questions)
+        self.digest = digest
+        self.version = version
+        self._set_stable_ids(array('Q', (q.get('id', n) for n, q in enumerate(self.questions))))
+        self._set_index(_build_index((q.get('category'), q.get('difficulty')) for q in self.questions))
+
+    def _set_stable_ids(self, stable_ids):
+        explicit = any(stable_id != n for n, stable_id in enumerate(stable_ids))
+        self._stable_ids = stable_ids if explicit else None
+        self._positions = None
+
+    def _set_index(self, index):
+        self.index = index
+        self.categories = sorted(c for c in self.index if c != ALL)
+        self.counts = {
+            category: {difficulty: len(ids) for difficulty, ids in buckets.items()}
+            for category, buckets in self.index.items()
+        }
+
+    def __len__(self):
+        return len(self.questions)
+
+    def get(self, question_id):
+        return self.questions[question_id]
+
+    def ids(self):
+        return list(range(len(self)))
+
+    def stable_id(self, position):
+        return position if self._stable_ids is None else self._stable_ids[position]
+
+    def position_of(self, stable_id):
+        if self._stable_ids is None:
+            return stable_id if 0 <= stable_id < len(self) else None
+        if self._positions is None:
+            self._positions = {stable_id: n for n, stable_id in enumerate(self._stable_ids)}
+        return self._positions.get(stable_id)
+
+    @timed('bank.filter_ids')
+    def filter_ids(self, category=ALL, difficulty=ALL):
+        buckets = self.index.get(category)
+        if buckets is None:
+            return []
+        ids = buckets.get(difficulty)
+        return ids.tolist() if ids is not None else []
+
+    def shuffled_ids(self, category=ALL, difficulty=ALL, rng=random):
+        ids = self.filter_ids(category, difficulty)
+        rng.shuffle(ids)
+        return ids
+
+
+class JsonlQuizBank(QuizBank):
+    __slots__ = ('path', '_offsets', '_mmap')
+
+    def __init__(self, path, header, offsets, category_codes, difficulty_codes, stable_ids):
+        self.path = path
+        self.questions = None
+        self.digest = header['source_digest']
+        self.version = header.get('version', 0)
+        self._set_stable_ids(stable_ids)
+        self._offsets = offsets
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b''
+        categories = header['categories']
+        difficulties = header['difficulties']
+        self._set_index(_build_index(
+            (_decode(categories, c, 'H'), _decode(difficulties, d, 'B'))
+            for c, d in zip(category_codes, difficulty_codes)
+        ))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def get(self, question_id):
+        if question_id < 0:
+            question_id += len(self)
+        line = self._mmap[self._offsets[question_id]:self._offsets[question_id + 1]]
+        return _freeze(json.loads(line))
+
+
+def _decode(names, code, typecode):
+    return None if code == NO_CODE[typecode] else names[code]
+
+
+def _build_index(keys_by_id):
+    index = {ALL: {ALL: array('I')}}
+    for question_id, (category, difficulty) in enumerate(keys_by_id):
+        index[ALL][ALL].append(question_id)
+        keys = [(ALL, difficulty)]
+        if category is not None:
+            keys += [(category, ALL), (category, difficulty)]
+        for c, d in keys:
+            if d is None:
+                continue
+            index.setdefault(c, {}).setdefault(d, array('I')).append(question_id)
+    return index
+
+
+def _freeze(question):
+    question = dict(question)
+    if isinstance(question.get('options'), list):
+        question['options'] = tuple(question['options'])
+    return MappingProxyType(question)
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@timed('bank.load_quizzes')
+def load_quizzes(path=QUIZZES_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['quizzes']
+
+
+class _Reader:
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def _fill(self):
+        raw = self.fp.read(READ_CHUNK)
+        chunk = self.utf8.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not raw
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"'{char}' attendu à la position {self.pos}, trouvé {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or len(self.buf) - self.pos > MAX_ITEM_SIZE:
+                    raise
+                self._fill()
+                continue
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_quizzes(fp, meta=None):
+    """Yield the questions of a ``{"quizzes": [...]}`` file one at a time.
+
+    Other top-level values are skipped, or collected into ``meta`` when given.
+    """
+    reader = _Reader(fp)
+    reader.expect('{')
+    found = False
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key != 'quizzes' or found:
+            value = reader.value()
+            if meta is not None:
+                meta[key] = value
+        else:
+            found = True
+            reader.expect('[')
+            while reader.peek() != ']':
+                yield reader.value()
+                if reader.peek() == ',':
+                    reader.pos += 1
+            reader.expect(']')
+        if reader.peek() == ',':
+            reader.pos += 1
+    reader.expect('}')
+    if not found:
+        raise ValueError("Le fichier JSON doit contenir une clé 'quizzes' avec une liste de questions.")
+
+
+def compiled_paths(path):
+    base = path[:-5] if path.endswith('.json') else path
+    return base + '.jsonl', base + '.jsonl.idx'
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def temp_path(path, suffix='.tmp'):
+    """Create a unique temporary file next to ``path`` (same filesystem, so os.replace is atomic)."""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix=suffix, dir=os.path.dirname(path) or '.')
+    os.close(fd)
+    os.chmod(tmp, 0o644)
+    return tmp
+
+
+def read_header(target):
+    try:
+        with open(target + '.idx', 'rb') as f:
+            return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def write_compiled(questions, target, source_digest, source_stamp=None, version=0):
+    """Write questions as JSON Lines plus a binary offsets/codes/stable-ids sidecar, atomically."""
+    index_path = target + '.idx'
+    categories, difficulties = {}, {}
+    offsets = array('Q', [0])
+    category_codes = array('H')
+    difficulty_codes = array('B')
+    stable_ids = array('Q')
+
+    tmp_target = temp_path(target)
+    tmp_index = temp_path(index_path)
+    try:
+        with open(tmp_target, 'wb') as out:
+            for question in questions:
+                line = json.dumps(question, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                out.write(line)
+                offsets.append(offsets[-1] + len(line))
+                category = question.get('category')
+                difficulty = question.get('difficulty')
+                category_codes.append(NO_CODE['H'] if category is None else categories.setdefault(category, len(categories)))
+                difficulty_codes.append(NO_CODE['B'] if difficulty is None else difficulties.setdefault(difficulty, len(difficulties)))
+                stable_id = question.get('id')
+                stable_ids.append(stable_id if isinstance(stable_id, int) and stable_id >= 0 else len(stable_ids))
+
+        header = {
+            'format': INDEX_FORMAT,
+            'count': len(category_codes),
+            'size': offsets[-1],
+            'source_digest': source_digest,
+            'source_stamp': source_stamp,
+            'version': version,
+            'byteorder': sys.byteorder,
+            'categories': list(categories),
+            'difficulties': list(difficulties),
+        }
+        with open(tmp_index, 'wb') as out:
+            out.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            offsets.tofile(out)
+            category_codes.tofile(out)
+            difficulty_codes.tofile(out)
+            stable_ids.tofile(out)
+
+        os.replace(tmp_target, target)
+        os.replace(tmp_index, index_path)
+    finally:
+        for tmp in (tmp_target, tmp_index):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return header
+
+
+@timed('bank.compile')
+def compile_bank(path=QUIZZES_PATH, target=None, digest=None, version=None):
+    target = target or compiled_paths(path)[0]
+    digest = digest or _file_digest(path)
+    if version is None:
+        version = (read_header(target) or {}).get('version', 0)
+    with open(path, 'rb') as f:
+        return write_compiled(iter_quizzes(f), target, digest, source_stamp(path), version)
+
+
+def open_compiled(target, source_digest=None, stamp=None):
+    index_path = target + '.idx'
+    try:
+        with open(index_path, 'rb') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != INDEX_FORMAT or header.get('byteorder') != sys.byteorder:
+                return None
+            if source_digest is not None and header.get('source_digest') != source_digest:
+                return None
+            if stamp is not None and header.get('source_stamp') != list(stamp):
+                return None
+            if os.path.getsize(target) != header['size']:
+                return None
+            count = header['count']
+            offsets = array('Q')
+            offsets.fromfile(f, count + 1)
+            category_codes = array('H')
+            category_codes.fromfile(f, count)
+            difficulty_codes = array('B')
+            difficulty_codes.fromfile(f, count)
+            stable_ids = array('Q')
+            stable_ids.fromfile(f, count)
+    except (OSError, EOFError, ValueError, KeyError):
+        return None
+    return JsonlQuizBank(target, header, offsets, category_codes, difficulty_codes, stable_ids)
+
+
+def get_bank(path=QUIZZES_PATH):
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _banks.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with _lock, span('bank.load'):
+        cached = _banks.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        target = compiled_paths(path)[0]
+        bank = open_compiled(target, stamp=stamp)
+        if bank is None:
+            digest = _file_digest(path)
+            if cached is not None and cached[1].digest == digest:
+                bank = cached[1]
+            else:
+                bank = open_compiled(target, digest)
+                if bank is None:
+                    compile_bank(path, target, digest)
+                    bank = open_compiled(target, digest)
+        _banks[path] = (stamp, bank)
+        return bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertit une banque {\"quizzes\": [...]} en JSON Lines indexé")
+    parser.add_argument('source', nargs='?', default=QUIZZES_PATH)
+    parser.add_argument('target', nargs='?')
+    args = parser.parse_args()
+
+    target = args.target or compiled_paths(args.source)[0]
+    header = compile_bank(args.source, target)
+    print(f"{header['count']} questions -> {target} (+ {target}.idx)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from array import array
+
+import numpy as np
+
+from quiz_bank import DIFFICULTIES, QUIZZES_PATH, _lock, compile_bank, compiled_paths, iter_quizzes, read_header, temp_path
+
+REQUIRED_FIELDS = ['question', 'options', 'answer', 'category', 'difficulty']
+MAX_REPORTED_ERRORS = 1000
+MAX_REPORTED_CHANGES = 100
+NO_ID = -1
+ADDED, REMOVED, CHANGED = 1, 2, 3
+STATUSES = {ADDED: 'added', REMOVED: 'removed', CHANGED: 'changed'}
+ARABIC_FOLDING = str.maketrans({'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي', 'ـ': None})
+
+
+class ImportReport:
+    __slots__ = ('rows', 'accepted', 'duplicates', 'rejected', 'errors', 'version', 'merge')
+
+    def __init__(self):
+        self.rows = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors = []
+        self.version = None
+        self.merge = None
+
+    def add_error(self, row, message):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, message))
+
+
+def normalize_text(text):
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).translate(ARABIC_FOLDING)
+    text = re.sub(r'[^\w\s]', ' ', text.casefold())
+    return ' '.join(text.split())
+
+
+def validate_question(question):
+    if not isinstance(question, dict):
+        return ["la question doit être un objet JSON"]
+
+    errors = []
+    for field in REQUIRED_FIELDS:
+        value = question.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            errors.append(f"champ '{field}' manquant ou vide")
+    if errors:
+        return errors
+
+    for field in ('question', 'answer', 'category', 'difficulty'):
+        if not isinstance(question[field], str):
+            errors.append(f"champ '{field}' doit être une chaîne")
+    options = question['options']
+    if not isinstance(options, list) or not options:
+        errors.append("champ 'options' doit être une liste non vide")
+    elif any(not isinstance(o, str) or not o.strip() for o in options):
+        errors.append("toutes les options doivent être des chaînes non vides")
+    elif question['answer'] not in options:
+        errors.append("la réponse ne figure pas parmi les options")
+    if question['difficulty'] not in DIFFICULTIES:
+        errors.append(f"difficulté '{question['difficulty']}' invalide (attendu : {', '.join(DIFFICULTIES)})")
+    return errors
+
+
+def question_key(question):
+    """Stable 64-bit identity of a question: its normalized wording."""
+    digest = hashlib.blake2b(normalize_text(question['question']).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def content_key(question):
+    fields = {field: question.get(field) for field in REQUIRED_FIELDS}
+    data = json.dumps(fields, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def _accepted_questions(fp, report):
+    seen = set()
+    for row, question in enumerate(iter_quizzes(fp), start=1):
+        report.rows = row
+        errors = validate_question(question)
+        if errors:
+            report.rejected += 1
+            report.add_error(row, '; '.join(errors))
+            continue
+        key = question_key(question)
+        if key in seen:
+            report.duplicates += 1
+            report.add_error(row, "doublon d'une question précédente")
+            continue
+        seen.add(key)
+        report.accepted += 1
+        yield {field: question[field] for field in REQUIRED_FIELDS}
+
+
+def write_bank(questions, path, meta=None):
+    """Write a ``{"quizzes": [...]}`` bank atomically and return its sha256; ``meta`` keys precede the questions."""
+    tmp_path = temp_path(path)
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, 'wb') as out:
+            def write(text):
+                data = text.encode('utf-8')
+                digest.update(data)
+                out.write(data)
+
+            write('{\n')
+            for key, value in (meta or {}).items():
+                write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+            write('  "quizzes": [')
+            for n, question in enumerate(questions):
+                item = json.dumps(question, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+                write((',\n    ' if n else '\n    ') + item)
+            write('\n  ]\n}\n')
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return digest.hexdigest()
+
+
+class MergeReport:
+    __slots__ = ('sources', 'total', 'added', 'removed', 'changed', 'unchanged', 'skipped', 'examples', 'digest')
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+        self.total = 0
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.examples = {'added': [], 'removed': [], 'changed': []}
+        self.digest = None
+
+    def add_example(self, kind, stable_id, question):
+        if len(self.examples[kind]) < MAX_REPORTED_CHANGES:
+            self.examples[kind].append((stable_id, question.get('question')))
+
+
+def _iter_bank(path, meta=None):
+    with open(path, 'rb') as f:
+        for question in iter_quizzes(f, meta):
+            if isinstance(question, dict) and isinstance(question.get('question'), str):
+                yield question
+            else:
+                yield None
+
+
+def _fingerprint(path, base, report, meta):
+    """Hash every question of a bank: wording key, content key and explicit (or, for the base, positional) id."""
+    keys, contents, ids, valid = array('Q'), array('Q'), array('q'), array('B')
+    for row, question in enumerate(_iter_bank(path, meta)):
+        if question is None:
+            report.skipped += 1
+            keys.append(0)
+            contents.append(0)
+            ids.append(NO_ID)
+            valid.append(0)
+            continue
+        keys.append(question_key(question))
+        contents.append(content_key(question))
+        stable_id = question.get('id', row if base else NO_ID)
+        ids.append(stable_id if isinstance(stable_id, int) and stable_id >= 0 else NO_ID)
+        valid.append(1)
+    return (np.frombuffer(keys, dtype=np.uint64), np.frombuffer(contents, dtype=np.uint64),
+            np.frombuffer(ids, dtype=np.int64), np.frombuffer(valid, dtype=bool))
+
+
+def merge_banks(paths, output=None, keep_removed=False):
+    """Merge banks listed oldest first, matching questions by normalized wording.
+
+    The newest version of each question wins and keeps the id it had in the
+    earliest bank containing it, so per-question stats survive the merge; new
+    questions get fresh ids. Questions missing from the newest bank are dropped
+    unless ``keep_removed``; the output remembers their ids under ``retired_ids``
+    so a question added back gets its old id, and ``next_id`` makes sure no id is
+    ever handed to a different question. Only fixed-size hashes are held in memory: the banks
+    are streamed once to fingerprint them and once more to write ``output``
+    (report only when ``output`` is None). The report compares the result with
+    the first bank.
+    """
+    report = MergeReport(paths)
+    metas = [{} for _ in paths]
+    columns = [[], [], [], []]
+    for n, (path, meta) in enumerate(zip(paths, metas)):
+        for column, values in zip(columns, _fingerprint(path, n == 0, report, meta)):
+            column.append(values)
+    sizes = [len(values) for values in columns[0]]
+    keys, contents, ids, valid = (np.concatenate(column) for column in columns)
+    del columns
+    newest = len(paths) - 1
+    banks = np.repeat(np.arange(len(paths)), sizes)
+    rows = np.concatenate([np.arange(size) for size in sizes])
+
+    order = np.lexsort((rows, banks, keys))
+    order = order[valid[order]]
+    sorted_keys, sorted_banks = keys[order], banks[order]
+    first_in_bank = np.ones(len(order), dtype=bool)
+    first_in_bank[1:] = (sorted_keys[1:] != sorted_keys[:-1]) | (sorted_banks[1:] != sorted_banks[:-1])
+    order = order[first_in_bank]
+    del sorted_keys, sorted_banks, first_in_bank
+    starts = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1]]) if len(order) else order[:0]
+    ends = np.r_[starts[1:], len(order)] if len(order) else starts
+    first, last = order[starts], order[ends - 1]
+    live = (banks[last] == newest) | keep_removed
+
+    # Each group takes the id of its earliest member carrying one. Groups that
+    # compete for an id, may reuse a retired one, need a new one or are being
+    # removed are settled one by one, in key order.
+    retired = {}
+    for meta in reversed(metas):
+        retired.update(meta.get('retired_ids') or {})
+    member_ids = ids[order]
+    member_groups = np.repeat(np.arange(len(starts)), ends - starts)
+    has_id = member_ids != NO_ID
+    positions = np.where(has_id, np.arange(len(order)), len(order))
+    first_with_id = np.minimum.reduceat(positions, starts) if len(starts) else starts
+    stable = np.full(len(starts), NO_ID, dtype=np.int64)
+    found = first_with_id < ends
+    stable[found] = member_ids[first_with_id[found]]
+    pairs = np.unique(np.stack((member_ids[has_id], member_groups[has_id])), axis=1)
+    values, counts = np.unique(pairs[0], return_counts=True)
+    contested = np.union1d(values[counts > 1], np.fromiter(retired.values(), dtype=np.int64, count=len(retired)))
+    unsettled = ~found | ~live
+    unsettled[member_groups[np.isin(member_ids, contested)]] = True
+    del member_groups, positions, first_with_id, pairs
+
+    next_id = max([int(ids.max(initial=NO_ID)) + 1, max(retired.values(), default=NO_ID) + 1]
+                  + [meta.get('next_id', 0) for meta in metas])
+    assigned = set()
+    for group in np.flatnonzero(unsettled).tolist():
+        key = f"{int(keys[first[group]]):016x}"
+        stable_id = next((i for i in member_ids[starts[group]:ends[group]].tolist() if i != NO_ID and i not in assigned), NO_ID)
+        if stable_id == NO_ID and retired.get(key) not in assigned:
+            stable_id = retired.get(key, NO_ID)
+        if not live[group]:
+            if stable_id != NO_ID:
+                retired[key] = stable_id
+            continue
+        retired.pop(key, None)
+        if stable_id == NO_ID:
+            stable_id = next_id
+            next_id += 1
+        assigned.add(stable_id)
+        stable[group] = stable_id
+    stable[~live] = NO_ID
+    if retired:
+        retired_ids = np.fromiter(retired.values(), dtype=np.int64, count=len(retired))
+        reused = set(retired_ids[np.isin(retired_ids, stable[live])].tolist())
+        retired = {key: stable_id for key, stable_id in retired.items() if stable_id not in reused}
+
+    in_base = banks[first] == 0
+    changed = contents[first] != contents[last]
+    report.added = int(np.count_nonzero(live & ~in_base))
+    report.removed = int(np.count_nonzero(~live & in_base))
+    report.changed = int(np.count_nonzero(live & in_base & changed))
+    report.unchanged = int(np.count_nonzero(live & in_base & ~changed))
+    report.total = int(np.count_nonzero(live))
+    winners = [np.full(size, NO_ID, dtype=np.int64) for size in sizes]
+    statuses = [np.zeros(size, dtype=np.int8) for size in sizes]
+    status = np.where(in_base, np.where(changed, CHANGED, 0), ADDED).astype(np.int8)
+    for n in range(len(paths)):
+        won = live & (banks[last] == n)
+        winners[n][rows[last[won]]] = stable[won]
+        statuses[n][rows[last[won]]] = status[won]
+    statuses[0][rows[first[~live & in_base]]] = REMOVED
+    del order, member_ids, keys, contents, ids, valid, banks, rows
+
+    def merged():
+        for n in reversed(range(len(paths))):
+            if not statuses[n].any() and (winners[n] == NO_ID).all():
+                continue
+            for row, (question, stable_id, status) in enumerate(
+                    zip(_iter_bank(paths[n]), winners[n].tolist(), statuses[n].tolist())):
+                if status:
+                    report.add_example(STATUSES[status], stable_id if stable_id != NO_ID else question.get('id', row), question)
+                if stable_id != NO_ID:
+                    yield {'id': stable_id, **{k: v for k, v in question.items() if k != 'id'}}
+
+    if output is None:
+        for _ in merged():
+            pass
+    else:
+        report.digest = write_bank(merged(), output, {'next_id': next_id, 'retired_ids': retired})
+    return report
+
+
+def import_quizzes(fp, path=QUIZZES_PATH, dry_run=False, keep_existing=False):
+    """Stream, validate and deduplicate a quiz upload, then merge it into the bank.
+
+    The upload replaces the bank's questions (or is added to them with
+    ``keep_existing``) while questions with unchanged wording keep their ids.
+    """
+    report = ImportReport()
+    upload_path = temp_path(path, '.upload')
+    try:
+        write_bank(_accepted_questions(fp, report), upload_path)
+        if report.accepted == 0:
+            return report
+        if dry_run:
+            sources = [path, upload_path] if os.path.exists(path) else [upload_path]
+            report.merge = merge_banks(sources, keep_removed=keep_existing)
+            return report
+        # Serialise writers and keep get_bank() from compiling the new bank
+        # while the merge, recompile and version bump are in progress.
+        with _lock:
+            sources = [path, upload_path] if os.path.exists(path) else [upload_path]
+            report.merge = merge_banks(sources, path, keep_removed=keep_existing)
+            target = compiled_paths(path)[0]
+            report.version = (read_header(target) or {}).get('version', 0) + 1
+            compile_bank(path, target, report.merge.digest, version=report.version)
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importe une banque de questions en la validant au fil de l'eau")
+    parser.add_argument('source')
+    parser.add_argument('--bank', default=QUIZZES_PATH)
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--keep-existing', action='store_true', help="ajouter aux questions actuelles au lieu de les remplacer")
+    args = parser.parse_args()
+
+    with open(args.source, 'rb') as f:
+        report = import_quizzes(f, args.bank, dry_run=args.dry_run, keep_existing=args.keep_existing)
+    for row, message in report.errors:
+        print(f"question {row}: {message}")
+    print(f"{report.rows} lues, {report.accepted} acceptées, {report.rejected} rejetées, {report.duplicates} doublons")
+    if report.merge is not None:
+        print(format_merge(report.merge))
+    if report.version is not None:
+        print(f"{args.bank} remplacée (version {report.version})")
+
+
+def format_merge(report):
+    return (f"{report.added} ajoutées, {report.removed} retirées, {report.changed} modifiées, "
+            f"{report.unchanged} inchangées -> {report.total} questions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import argparse
+
+from quiz_import import format_merge, merge_banks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare et fusionne des banques de questions (de la plus ancienne à la plus récente) "
+                    "en conservant les identifiants stables")
+    parser.add_argument('banks', nargs='+')
+    parser.add_argument('-o', '--output', help="banque fusionnée à écrire (sinon : rapport seul)")
+    parser.add_argument('--keep-removed', action='store_true', help="garder les questions absentes de la dernière banque")
+    parser.add_argument('--details', action='store_true', help="lister les questions ajoutées, retirées et modifiées")
+    args = parser.parse_args()
+
+    report = merge_banks(args.banks, args.output, keep_removed=args.keep_removed)
+    if args.details:
+        for kind, examples in report.examples.items():
+            for stable_id, question in examples:
+                print(f"{kind:>8} #{stable_id}: {question}")
+    if report.skipped:
+        print(f"{report.skipped} entrées sans question ignorées")
+    print(format_merge(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+import metrics
+from database import init_db, save_session
+from game import TIE, GameSession
+from quiz_bank import ALL, get_bank
+from selection import select_questions
+from telemetry import record_results
+
+DEFAULT_QUESTIONS = 10
+DEFAULT_TIMER = 30
+MAX_PLAYERS = 8
+
+
+def _option(message, key, default, convert):
+    value = message.get(key)
+    return default if value is None else convert(value)
+
+
+class Room:
+    """One match: a GameSession plus the connected sockets of its players."""
+
+    def __init__(self, room_id, size, questions, category, difficulty, timer):
+        self.room_id = room_id
+        self.size = size
+        self.questions = questions
+        self.category = category
+        self.difficulty = difficulty
+        self.timer = timer
+        self.sockets = {}
+        self.started = False
+        self.game = None
+        self.bank = None
+        self.deadline_task = None
+
+    @property
+    def full(self):
+        return len(self.sockets) >= self.size
+
+    @property
+    def waiting_for(self):
+        return [player for player in self.game.waiting_for if player in self.sockets]
+
+    async def broadcast(self, message):
+        data = json.dumps(message, ensure_ascii=False)
+        await asyncio.gather(*(self._send(ws, data) for ws in list(self.sockets.values())))
+
+    async def _send(self, ws, data):
+        try:
+            await ws.send(data)
+        except ConnectionClosed:
+            pass
+
+
+class RoomService:
+    def __init__(self, persist=True):
+        self.rooms = {}
+        self.persist = persist
+        self.games_finished = 0
+
+    async def handler(self, ws):
+        room = player = None
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                kind = message.get('type')
+                if kind == 'join' and room is None:
+                    room, player, starts = await self.join(ws, message)
+                    if starts:
+                        await self.start(room)
+                elif kind == 'answer' and room is not None:
+                    await self.answer(room, player, message.get('option'))
+        except (ConnectionClosed, ValueError, TypeError):
+            pass
+        finally:
+            if room is not None:
+                await self.leave(room, player)
+
+    async def join(self, ws, message):
+        room_id = str(message.get('room') or f"room-{random.getrandbits(32):08x}")
+        player = str(message.get('player') or f"Joueur {random.randrange(1000)}")
+        room = self.rooms.get(room_id)
+        if room is None:
+            timer = _option(message, 'timer', DEFAULT_TIMER, float)
+            if not math.isfinite(timer):
+                raise ValueError(f"invalid timer: {timer}")
+            room = Room(
+                room_id,
+                size=max(1, min(_option(message, 'size', 2, int), MAX_PLAYERS)),
+                questions=max(1, _option(message, 'questions', DEFAULT_QUESTIONS, int)),
+                category=_option(message, 'category', ALL, str),
+                difficulty=_option(message, 'difficulty', ALL, str),
+                timer=max(0.0, timer),
+            )
+            self.rooms[room_id] = room
+        if room.full or room.started or player in room.sockets:
+            await ws.send(json.dumps({'type': 'error', 'message': "Salle complète ou nom déjà pris."}))
+            return None, None, False
+
+        # Decided before the first await: only the player who fills the room starts it.
+        room.sockets[player] = ws
+        starts = room.started = room.full
+        await room.broadcast({'type': 'joined', 'room': room_id, 'players': list(room.sockets), 'size': room.size})
+        return room, player, starts
+
+    @staticmethod
+    def draw(room):
+        """Load the bank and pick the questions; may hash, compile or query, so it runs off the event loop."""
+        bank = get_bank()
+        ids = select_questions(bank, room.category, room.difficulty, k=room.questions)
+        return bank, ids or select_questions(bank, k=room.questions)
+
+    async def start(self, room):
+        room.bank, ids = await asyncio.get_running_loop().run_in_executor(None, self.draw, room)
+        if not room.sockets:
+            return
+        room.game = GameSession(ids, room.bank.digest, players=room.sockets)
+        room.game.timer_enabled = room.timer > 0
+        room.game.timer_duration = room.timer
+        await self.ask(room)
+
+    async def ask(self, room):
+        game = room.game
+        now = time.time()
+        game.show_question(now)
+        question = room.bank.get(game.current_id)
+        await room.broadcast({
+            'type': 'question',
+            'index': game.current_question,
+            'total': len(game),
+            'question': question['question'],
+            'options': list(question['options']),
+            'remaining': game.remaining(now),
+        })
+        if game.deadline is not None:
+            room.deadline_task = asyncio.create_task(self.expire(room, game.current_question, game.deadline - now))
+
+    async def expire(self, room, index, delay):
+        await asyncio.sleep(delay)
+        if room.game is not None and room.game.current_question == index and not room.game.answered:
+            await self.score(room)
+
+    async def answer(self, room, player, option):
+        game = room.game
+        if game is None or game.finished:
+            return
+        if not game.choose(player, option, time.time()):
+            if game.is_expired(time.time()):
+                await self.score(room)
+            return
+        if not room.waiting_for:
+            await self.score(room)
+
+    async def score(self, room):
+        game = room.game
+        if room.deadline_task is not None and room.deadline_task is not asyncio.current_task():
+            room.deadline_task.cancel()
+        room.deadline_task = None
+        question = room.bank.get(game.current_id)
+        record_results(game.validate(question['answer']), room.bank, timeout=0)
+        await room.broadcast({
+            'type': 'result',
+            'index': game.current_question,
+            'answer': question['answer'],
+            'choices': dict(game.choices),
+            'scores': dict(game.scores),
+        })
+        game.next_question(time.time())
+        if game.finished:
+            await self.finish(room)
+        else:
+            await self.ask(room)
+
+    async def finish(self, room):
+        game = room.game
+        winner = game.winner()
+        await room.broadcast({'type': 'finished', 'scores': dict(game.scores), 'winner': winner if winner != TIE else None})
+        if self.persist and not game.saved:
+            game.saved = True
+            await asyncio.get_running_loop().run_in_executor(
+                None, save_session, dict(game.scores), len(game), "room", game.category_answers(room.bank))
+        self.games_finished += 1
+        self.remove(room)
+
+    async def leave(self, room, player):
+        room.sockets.pop(player, None)
+        game = room.game
+        if game is not None and not game.finished and room.sockets and not game.answered and not room.waiting_for:
+            await self.score(room)
+        if not room.sockets:
+            if room.deadline_task is not None:
+                room.deadline_task.cancel()
+            self.remove(room)
+
+    def remove(self, room):
+        # The id may already belong to a newer room whose players joined after this game ended.
+        if self.rooms.get(room.room_id) is room:
+            del self.rooms[room.room_id]
+
+
+async def serve_rooms(host, port, service=None, ready=None):
+    service = service or RoomService()
+    async with serve(service.handler, host, port, max_queue=64) as server:
+        if ready is not None:
+            ready.set_result(server)
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de salles de quiz en temps réel (WebSocket)")
+    parser.add_argument('--host', default=os.getenv('ROOMS_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('ROOMS_PORT', '8765')))
+    args = parser.parse_args()
+
+    init_db()
+    get_bank()
+    if metrics.METRICS_PORT:
+        metrics.serve_metrics(metrics.METRICS_PORT)
+    print(f"Salles de quiz sur ws://{args.host}:{args.port}")
+    asyncio.run(serve_rooms(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
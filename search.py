@@ -0,0 +1,277 @@
+import argparse
+import bisect
+import threading
+from array import array
+
+import numpy as np
+
+from metrics import span, timed
+from quiz_bank import QUIZZES_PATH, get_bank, iter_quizzes
+from quiz_import import normalize_text
+
+SEARCH_LIMIT = 50
+MAX_EXPANSIONS = 50
+MIN_FUZZY_LENGTH = 4
+
+SHINGLE_SIZE = 4
+NUM_PERM = 80
+BANDS = 16
+DUPLICATE_THRESHOLD = 0.8
+MAX_BUCKET = 32
+MINHASH_CHUNK = 20_000
+
+_lock = threading.Lock()
+_index = None
+
+
+def search_text(question):
+    return ' '.join([question.get('question', ''), *question.get('options', ())])
+
+
+def duplicate_text(question):
+    return f"{question.get('question', '')} {question.get('answer', '')}"
+
+
+def _contains(ids, question_id):
+    i = bisect.bisect_left(ids, question_id)
+    return i < len(ids) and ids[i] == question_id
+
+
+def _edits(term, alphabet):
+    splits = [(term[:i], term[i:]) for i in range(len(term) + 1)]
+    for left, right in splits:
+        if right:
+            yield left + right[1:]
+            if len(right) > 1:
+                yield left + right[1] + right[0] + right[2:]
+        for c in alphabet:
+            yield left + c + right
+            if right:
+                yield left + c + right[1:]
+
+
+class SearchIndex:
+    """Inverted index from accent-normalized tokens of question and option text to sorted question ids.
+
+    The last query term also matches as a prefix; a term with no match falls back to
+    vocabulary tokens one edit away.
+    """
+    __slots__ = ('bank', 'postings', '_vocabulary', '_alphabet')
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.postings = {}
+        for question_id in range(len(bank)):
+            for token in set(normalize_text(search_text(bank.get(question_id))).split()):
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = array('I')
+                ids.append(question_id)
+        self._vocabulary = None
+        self._alphabet = None
+
+    def __len__(self):
+        return len(self.postings)
+
+    @property
+    def vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+            self._alphabet = sorted(set(''.join(self._vocabulary)))
+        return self._vocabulary
+
+    def expand(self, term, prefix=False):
+        tokens = [term] if term in self.postings else []
+        if prefix:
+            vocabulary = self.vocabulary
+            start = bisect.bisect_left(vocabulary, term)
+            tokens += [t for t in vocabulary[start:start + MAX_EXPANSIONS] if t.startswith(term) and t != term]
+        if not tokens and len(term) >= MIN_FUZZY_LENGTH:
+            self.vocabulary
+            tokens = sorted({t for t in _edits(term, self._alphabet) if t in self.postings})[:MAX_EXPANSIONS]
+        return tokens
+
+    def search(self, query, limit=None):
+        terms = normalize_text(query).split()
+        lists = []
+        for n, term in enumerate(terms):
+            tokens = self.expand(term, prefix=n == len(terms) - 1)
+            if not tokens:
+                return []
+            if len(tokens) == 1:
+                lists.append(self.postings[tokens[0]])
+            else:
+                lists.append(array('I', sorted(set().union(*(self.postings[t] for t in tokens)))))
+        if not lists:
+            return []
+        lists.sort(key=len)
+        ids = lists[0].tolist()
+        for other in lists[1:]:
+            ids = [i for i in ids if _contains(other, i)]
+        return ids[:limit] if limit is not None else ids
+
+
+def get_index(bank):
+    global _index
+    index = _index
+    if index is not None and index.bank is bank:
+        return index
+    with _lock:
+        if _index is None or _index.bank is not bank:
+            with span('search.build_index'):
+                _index = SearchIndex(bank)
+        return _index
+
+
+@timed('search.search_questions')
+def search_questions(query, bank=None, limit=SEARCH_LIMIT):
+    bank = bank or get_bank()
+    return get_index(bank).search(query, limit)
+
+
+def _permutations(num_perm, seed=1):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 31, num_perm, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+    b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint32)
+    return a, b
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, chunk=MINHASH_CHUNK):
+    """MinHash signatures over character shingles of normalized texts, one row per text.
+
+    Shingles of a whole chunk are hashed in one vectorized pass with multiply-shift
+    hashing; each permutation keeps a 16-bit value to keep 1M signatures in 160 MB.
+    """
+    a, b = _permutations(num_perm)
+    blocks = []
+    batch = []
+    for text in texts:
+        batch.append(normalize_text(text).ljust(SHINGLE_SIZE))
+        if len(batch) == chunk:
+            blocks.append(_signature_block(batch, a, b))
+            batch = []
+    if batch or not blocks:
+        blocks.append(_signature_block(batch, a, b))
+    return np.concatenate(blocks)
+
+
+def _signature_block(texts, a, b):
+    if not texts:
+        return np.empty((0, len(a)), dtype=np.uint16)
+    k = SHINGLE_SIZE
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer('\0'.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    m = len(codes) - k + 1
+    hashes = np.zeros(m, dtype=np.uint64)
+    for j in range(k):
+        hashes = hashes * np.uint64(1000003) + codes[j:j + m]
+    hashes = ((hashes * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)).astype(np.uint32)
+
+    ends = np.cumsum(lengths + 1) - 1
+    valid = np.arange(m) + k <= np.repeat(ends, lengths + 1)[:m]
+    hashes = hashes[valid]
+    offsets = np.concatenate(([0], np.cumsum(lengths - k + 1)[:-1]))
+
+    signatures = np.empty((len(texts), len(a)), dtype=np.uint16)
+    shift = np.uint32(16)
+    for p in range(len(a)):
+        values = (a[p] * hashes + b[p]) >> shift
+        signatures[:, p] = np.minimum.reduceat(values, offsets)
+    return signatures
+
+
+def _band_keys(signatures, band, rows):
+    key = np.zeros(len(signatures), dtype=np.uint64)
+    for column in range(band * rows, (band + 1) * rows):
+        key = key * np.uint64(0x100000001B3) + signatures[:, column]
+    return key
+
+
+def candidate_pairs(signatures, bands=BANDS):
+    """LSH banding: every pair sharing a band bucket, O(n log n) per band.
+
+    Buckets larger than MAX_BUCKET only pair each member with the bucket's first one,
+    so a flood of identical questions stays linear.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        keys = _band_keys(signatures, band, rows)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        shared = np.zeros(n, dtype=bool)
+        shared[1:] |= same
+        shared[:-1] |= same
+        order = order[shared]
+        sorted_keys = sorted_keys[shared]
+        if not len(order):
+            continue
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+        sizes = np.diff(np.append(np.flatnonzero(starts), len(order)))
+        small = np.repeat(sizes <= MAX_BUCKET, sizes)
+        pairs.append(np.stack((order[first[~small & ~starts]], order[~small & ~starts]), axis=1))
+        for offset in range(1, min(sizes.max(), MAX_BUCKET)):
+            left = np.flatnonzero(small[:-offset] & (first[:-offset] == first[offset:]))
+            pairs.append(np.stack((order[left], order[left + offset]), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def near_duplicates(texts, threshold=DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """Return ``(i, j, similarity)`` for text pairs whose estimated Jaccard similarity reaches ``threshold``."""
+    signatures = minhash_signatures(texts, num_perm)
+    pairs = candidate_pairs(signatures, bands)
+    result = []
+    for start in range(0, len(pairs), MINHASH_CHUNK):
+        block = pairs[start:start + MINHASH_CHUNK]
+        similarity = (signatures[block[:, 0]] == signatures[block[:, 1]]).mean(axis=1)
+        keep = similarity >= threshold
+        result.extend(zip(block[keep, 0].tolist(), block[keep, 1].tolist(), similarity[keep].tolist()))
+    return result
+
+
+@timed('search.near_duplicates')
+def bank_near_duplicates(bank, threshold=DUPLICATE_THRESHOLD):
+    return near_duplicates((duplicate_text(bank.get(i)) for i in range(len(bank))), threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche et détection de quasi-doublons dans les banques de questions")
+    commands = parser.add_subparsers(dest='command', required=True)
+    find = commands.add_parser('find', help="rechercher une question")
+    find.add_argument('query')
+    find.add_argument('--bank', default=QUIZZES_PATH)
+    find.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+    duplicates = commands.add_parser('duplicates', help="lister les quasi-doublons d'une ou plusieurs banques")
+    duplicates.add_argument('banks', nargs='*', default=[QUIZZES_PATH])
+    duplicates.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == 'find':
+        bank = get_bank(args.bank)
+        for question_id in search_questions(args.query, bank, args.limit):
+            question = bank.get(question_id)
+            print(f"{question_id}: {question['question']} -> {question.get('answer')}")
+        return
+
+    sources, questions = [], []
+    for path in args.banks:
+        with open(path, 'rb') as f:
+            for row, question in enumerate(iter_quizzes(f), start=1):
+                sources.append((path, row))
+                questions.append(question)
+    pairs = near_duplicates(map(duplicate_text, questions), args.threshold)
+    for i, j, similarity in sorted(pairs, key=lambda pair: -pair[2]):
+        print(f"{similarity:.2f}  {sources[i][0]}#{sources[i][1]}: {questions[i]['question']}")
+        print(f"      {sources[j][0]}#{sources[j][1]}: {questions[j]['question']}")
+    print(f"{len(pairs)} paires de quasi-doublons sur {len(questions)} questions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import heapq
+import math
+import os
+import random
+import threading
+import time
+from array import array
+
+import database
+from metrics import span, timed
+from quiz_bank import ALL
+
+TARGET_SUCCESS = float(os.getenv('SELECTION_TARGET_SUCCESS', '0.7'))
+SPREAD = 0.2
+MIN_WEIGHT = 0.05
+REFRESH_SECONDS = float(os.getenv('SELECTION_REFRESH_SECONDS', '300'))
+MAX_REJECTIONS = 20
+
+_lock = threading.Lock()
+_selector = None
+
+
+def logit_ratio(successes, failures):
+    return math.log((successes + 1) / (failures + 1))
+
+
+def success_weight(margin, target=TARGET_SUCCESS):
+    p = 1 / (1 + math.exp(-margin))
+    return MIN_WEIGHT + math.exp(-((p - target) ** 2) / (2 * SPREAD ** 2))
+
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per weighted draw."""
+    __slots__ = ('ids', 'prob', 'alias')
+
+    def __init__(self, ids, weights):
+        n = len(ids)
+        self.ids = ids
+        self.prob = array('d', bytes(8 * n))
+        self.alias = array('I', bytes(4 * n))
+        if n == 0:
+            return
+        total = sum(weights)
+        scaled = array('d', (w * n / total for w in weights))
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def draw(self, rng=random):
+        i = int(rng.random() * len(self.ids))
+        return self.ids[i] if rng.random() < self.prob[i] else self.ids[self.alias[i]]
+
+
+def iter_weighted(ids, weights, rng=random):
+    """Yield ids in weighted random order without replacement, O(log n) per draw."""
+    heap = [(rng.expovariate(1.0) / w, question_id) for question_id, w in zip(ids, weights)]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+class Selector:
+    """Per-question weights derived from answer history, favouring questions near the target success rate."""
+
+    def __init__(self, bank, question_stats=(), player_stats=(), target=TARGET_SUCCESS):
+        self.bank = bank
+        self.built_at = time.monotonic()
+        difficulty = array('d', bytes(8 * len(bank)))
+        for question_id, answers, correct in question_stats:
+            position = bank.position_of(question_id)
+            if position is not None:
+                difficulty[position] = logit_ratio(answers - correct, correct)
+        abilities = [logit_ratio(correct, answers - correct) for _, answers, correct in player_stats]
+        ability = sum(abilities) / len(abilities) if abilities else 0.0
+        self.weights = array('d', (success_weight(ability - d, target) for d in difficulty))
+        self._tables = {}
+
+    def table(self, category=ALL, difficulty=ALL):
+        key = (category, difficulty)
+        table = self._tables.get(key)
+        if table is None:
+            ids = self.bank.filter_ids(category, difficulty)
+            table = AliasTable(ids, [self.weights[i] for i in ids])
+            self._tables[key] = table
+        return table
+
+    def draw(self, category=ALL, difficulty=ALL, rng=random):
+        table = self.table(category, difficulty)
+        return table.draw(rng) if len(table) else None
+
+    def sample(self, category=ALL, difficulty=ALL, k=None, rng=random):
+        table = self.table(category, difficulty)
+        n = len(table)
+        k = n if k is None else min(k, n)
+        if 2 * k <= n:
+            chosen = {}
+            for _ in range(MAX_REJECTIONS * k):
+                chosen.setdefault(table.draw(rng))
+                if len(chosen) == k:
+                    return list(chosen)
+        ids = table.ids
+        order = iter_weighted(ids, [self.weights[i] for i in ids], rng)
+        return [next(order) for _ in range(k)]
+
+
+def _is_fresh(selector, bank):
+    return selector is not None and selector.bank is bank and time.monotonic() - selector.built_at < REFRESH_SECONDS
+
+
+def get_selector(bank):
+    global _selector
+    selector = _selector
+    if _is_fresh(selector, bank):
+        return selector
+    with _lock:
+        if not _is_fresh(_selector, bank):
+            with span('selection.build'):
+                _selector = Selector(bank, database.get_question_accuracy(), database.get_player_accuracy())
+        return _selector
+
+
+@timed('selection.select_questions')
+def select_questions(bank, category=ALL, difficulty=ALL, k=None, rng=random):
+    return get_selector(bank).sample(category, difficulty, k, rng)
@@ -0,0 +1,124 @@
+import atexit
+import os
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+
+import database
+from metrics import registry
+
+QUEUE_SIZE = int(os.getenv('TELEMETRY_QUEUE_SIZE', '10000'))
+BATCH_SIZE = int(os.getenv('TELEMETRY_BATCH_SIZE', '500'))
+FLUSH_INTERVAL = float(os.getenv('TELEMETRY_FLUSH_INTERVAL', '1.0'))
+PUT_TIMEOUT = 0.05
+
+_STOP = object()
+
+
+class AnswerEventWriter:
+    """Buffers answer events in a bounded queue and bulk-inserts them from a background thread."""
+
+    def __init__(self, session_factory, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name='answer-event-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, event, timeout=PUT_TIMEOUT):
+        try:
+            self.queue.put(event, timeout=timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                running = False
+                batch = [event for event in batch if event is not _STOP]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            try:
+                with self.session_factory() as db, db.begin():
+                    db.execute(insert(database.AnswerEvent), chunk)
+                self.written += len(chunk)
+            except Exception as e:
+                self.failed += len(chunk)
+                print(f"Warning: failed to write {len(chunk)} answer events: {e}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None and database.database_available():
+        with _writer_lock:
+            if _writer is None:
+                _writer = AnswerEventWriter(database.SessionLocal)
+                atexit.register(_writer.close)
+    return _writer
+
+
+def record_answer(question_id, player_name, choice, is_correct, latency=None, timeout=PUT_TIMEOUT):
+    """Queue one answer event; waits up to ``timeout`` seconds for room in the queue (0 never blocks)."""
+    writer = get_writer()
+    if writer is None:
+        return False
+    return writer.record({
+        'answered_at': datetime.utcnow(),
+        'question_id': question_id,
+        'player_name': player_name,
+        'choice': choice,
+        'is_correct': is_correct,
+        'latency_ms': None if latency is None else int(latency * 1000),
+    }, timeout)
+
+
+def record_results(results, bank, timeout=PUT_TIMEOUT):
+    """Record scored GameSession results under the bank's stable question ids."""
+    for result in results:
+        record_answer(bank.stable_id(result.question_id), *result[1:], timeout=timeout)
+
+
+def writer_stats():
+    writer = _writer
+    if writer is None:
+        return None
+    return {'queued': writer.queue.qsize(), 'written': writer.written,
+            'dropped': writer.dropped, 'failed': writer.failed}
+
+
+registry.add_collector('quiz_answer_events', writer_stats)